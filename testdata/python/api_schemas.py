@@ -0,0 +1,88 @@
+"""
+Pydantic models for API serialization.
+
+This module is imported lazily by ``models`` on first access to one of its
+schemas, so consumers that only need the ORM-like models never pay for
+Pydantic startup.
+"""
+
+import re
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+
+# Aliased so these never collide with the ORM ``BaseModel``/``Field`` in models
+from pydantic import BaseModel as PydanticModel, Field as PydanticField, validator
+
+_EMAIL_RE = re.compile(r'^[\w\.-]+@[\w\.-]+\.\w+$')
+
+
+class UserCreateRequest(PydanticModel):
+    """Pydantic model for user creation request."""
+    username: str = PydanticField(..., min_length=3, max_length=50)
+    email: str = PydanticField(...)
+    first_name: str = PydanticField(..., min_length=1, max_length=100)
+    last_name: str = PydanticField(..., min_length=1, max_length=100)
+    password: str = PydanticField(..., min_length=8)
+
+    @validator('email')
+    def email_format(cls, v):
+        # Ordinary addresses are accepted by string methods alone; only input
+        # these checks don't clear is run through the full pattern.
+        local, _, domain = v.partition('@')
+        stem, _, tld = domain.rpartition('.')
+        if (local and stem and tld
+                and (local + stem).replace('.', '').replace('-', '').replace('_', '').isalnum()
+                and tld.replace('_', '').isalnum()):
+            return v
+        if not _EMAIL_RE.match(v):
+            raise ValueError('Invalid email address')
+        return v
+
+    @validator('username')
+    def username_alphanumeric(cls, v):
+        assert v.isalnum(), 'Username must be alphanumeric'
+        return v
+
+    @validator('password')
+    def validate_password_strength(cls, v):
+        has_upper = has_lower = has_digit = False
+        for char in v:
+            if 'A' <= char <= 'Z':
+                has_upper = True
+            elif 'a' <= char <= 'z':
+                has_lower = True
+            elif char.isdecimal():
+                has_digit = True
+            else:
+                continue
+            if has_upper and has_lower and has_digit:
+                break
+        if not has_upper:
+            raise ValueError('Password must contain uppercase letter')
+        if not has_lower:
+            raise ValueError('Password must contain lowercase letter')
+        if not has_digit:
+            raise ValueError('Password must contain digit')
+        return v
+
+
+class ProductResponse(PydanticModel):
+    """Pydantic model for product API response."""
+    id: int
+    sku: str
+    name: str
+    description: Optional[str]
+    price: Decimal
+    category_id: int
+    in_stock: bool
+    stock_quantity: int
+    is_featured: bool
+    tags: List[str]
+    created_at: datetime
+
+    class Config:
+        json_encoders = {
+            Decimal: lambda v: float(v),
+            datetime: lambda v: v.isoformat()
+        }
@@ -11,28 +11,78 @@ This module demonstrates various Python features including:
 """
 
 import asyncio
+import heapq
 import logging
+import logging.handlers
 import os
+import queue
 import sys
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union, Any
-from dataclasses import dataclass, field
-from contextlib import contextmanager
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
 from pathlib import Path
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('app.log')
-    ]
-)
+from types import MappingProxyType
+
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_stdout_handler = logging.StreamHandler(sys.stdout)
+_stdout_handler.setFormatter(_log_formatter)
+# The app.log handler is added by setup_logging(), so importing this module
+# does not create the file.
+_log_handlers: List[logging.Handler] = [_stdout_handler]
+_file_handler: Optional[logging.FileHandler] = None
+
+# While the listener runs, records are queued on the calling thread and
+# formatted/written by the listener thread, keeping stream and file I/O off
+# the request path.
+_log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+_log_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_listener_started = False
+
+_root_logger = logging.getLogger()
+_root_logger.setLevel(logging.INFO)
+# Write directly until setup_logging() starts the listener
+_root_logger.addHandler(_stdout_handler)
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def setup_logging() -> None:
+    """Open app.log and route log records through the listener thread.
+
+    The queue handler replaces the direct handlers only once the listener is
+    running, so no record is left sitting in a queue nobody drains.
+    """
+    global _file_handler, _log_listener, _listener_started
+    if _listener_started:
+        return
+    if _file_handler is None:
+        _file_handler = logging.FileHandler('app.log')
+        _file_handler.setFormatter(_log_formatter)
+        _log_handlers.append(_file_handler)
+    _log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers)
+    _log_listener.start()
+    _root_logger.addHandler(_queue_handler)
+    for handler in _log_handlers:
+        _root_logger.removeHandler(handler)
+    _listener_started = True
+
+
+def shutdown_logging() -> None:
+    """Flush queued records, stop the listener and write directly again."""
+    global _listener_started
+    if _listener_started:
+        for handler in _log_handlers:
+            _root_logger.addHandler(handler)
+        _root_logger.removeHandler(_queue_handler)
+        _log_listener.stop()
+        _listener_started = False
+
+
+@dataclass(slots=True)
 class AppConfig:
     """Application configuration dataclass."""
     debug: bool = False
@@ -52,6 +102,42 @@ class AppConfig:
             raise ValueError("Rate limit must be positive")
 
 
+# Environment values accepted as boolean true
+_TRUTHY = frozenset({'true', '1', 'yes', 'on'})
+
+
+# Converters from environment strings to AppConfig field types
+_ENV_CONVERTERS: Dict[Any, Callable[[str], Any]] = {
+    bool: lambda value: value.lower() in _TRUTHY,
+    int: int,
+    float: float,
+    str: str,
+}
+
+
+@lru_cache(maxsize=1)
+def _env_config_values() -> Tuple[Tuple[str, Any], ...]:
+    """Parse the AppConfig overrides from environment variables.
+
+    Each AppConfig field with a scalar type is read from the upper-cased
+    variable of the same name. The environment is parsed once per process;
+    call ``_env_config_values.cache_clear()`` to pick up changes.
+    """
+    env = os.environ
+    values = []
+    for config_field in fields(AppConfig):
+        env_name = config_field.name.upper()
+        convert = _ENV_CONVERTERS.get(config_field.type)
+        if convert is not None and env_name in env:
+            values.append((config_field.name, convert(env[env_name])))
+    return tuple(values)
+
+
+def _config_from_env() -> AppConfig:
+    """Build a new configuration from the cached environment overrides."""
+    return AppConfig(**dict(_env_config_values()))
+
+
 class ConfigurationError(Exception):
     """Custom exception for configuration errors."""
     pass
@@ -65,6 +151,8 @@ class ValidationError(Exception):
 class BaseService:
     """Base service class providing common functionality."""
 
+    __slots__ = ('config', 'logger', '_initialized')
+
     def __init__(self, config: AppConfig):
         self.config = config
         self.logger = logging.getLogger(self.__class__.__name__)
@@ -101,9 +189,46 @@ class BaseService:
         return self._initialized
 
 
+def _select_result() -> List[Dict[str, Any]]:
+    """Mock result set returned for SELECT queries."""
+    return [{"id": 1, "name": "test", "created_at": datetime.now().isoformat()}]
+
+
+def _empty_result() -> List[Dict[str, Any]]:
+    """Mock result for statements that return no rows."""
+    return []
+
+
+# Smallest expiry heap size at which CacheService considers compaction
+_HEAP_COMPACT_MIN = 1024
+
+# Query issued by DatabaseService.health_check
+_HEALTH_CHECK_QUERY = "SELECT 1"
+
+# Last whole second formatted by _cached_iso_now and its ISO string
+_iso_now_cache: List[Any] = [0, '']
+
+
+def _cached_iso_now() -> str:
+    """Return the current time in ISO format at one-second resolution."""
+    now = int(time.time())
+    if now != _iso_now_cache[0]:
+        _iso_now_cache[0] = now
+        _iso_now_cache[1] = datetime.fromtimestamp(now).isoformat()
+    return _iso_now_cache[1]
+
+
+# Mock result builders keyed by lowercased SQL verb
+_VERB_HANDLERS = {
+    'select': _select_result,
+}
+
+
 class DatabaseService(BaseService):
     """Database service for handling data operations."""
 
+    __slots__ = ('_connection_pool', '_transaction_count')
+
     def __init__(self, config: AppConfig):
         super().__init__(config)
         self._connection_pool = None
@@ -121,156 +246,251 @@ class DatabaseService(BaseService):
             self.logger.info("Closing database connections")
             self._connection_pool = None
 
-    @contextmanager
-    def transaction(self):
+    def transaction(self) -> "_Transaction":
         """Database transaction context manager."""
-        self._transaction_count += 1
-        transaction_id = self._transaction_count
-
-        try:
-            self.logger.debug("Starting transaction %d", transaction_id)
-            yield transaction_id
-            self.logger.debug("Committing transaction %d", transaction_id)
-        except Exception as e:
-            self.logger.error("Rolling back transaction %d: %s", transaction_id, e)
-            raise
-        finally:
-            self.logger.debug("Ending transaction %d", transaction_id)
+        return _Transaction(self)
 
     async def execute_query(self, query: str, params: Optional[Dict] = None) -> List[Dict[str, Any]]:
         """Execute a database query."""
         if not self._initialized:
             raise RuntimeError("Database service not initialized")
 
-        self.logger.debug("Executing query: %s", query)
+        log = self.logger
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Executing query: %s", query)
 
         # Simulate query execution
         await asyncio.sleep(0.1)  # Simulate network delay
 
         # Return mock data based on query type
-        if query.lower().startswith('select'):
-            return [{"id": 1, "name": "test", "created_at": datetime.now().isoformat()}]
-        return []
+        return _VERB_HANDLERS.get(query[:6].lower(), _empty_result)()
+
+    async def execute_many(self, queries: List[Tuple[str, Optional[Dict]]]) -> List[List[Dict[str, Any]]]:
+        """Execute several independent queries concurrently."""
+        return await asyncio.gather(
+            *(self.execute_query(query, params) for query, params in queries)
+        )
 
     async def health_check(self) -> bool:
         """Check database health."""
         try:
-            await self.execute_query("SELECT 1")
+            await self.execute_query(_HEALTH_CHECK_QUERY)
             return True
         except Exception as e:
             self.logger.error("Database health check failed: %s", e)
             return False
 
 
+class _Transaction:
+    """Context manager for a single DatabaseService transaction."""
+
+    __slots__ = ('_logger', 'transaction_id')
+
+    def __init__(self, db_service: DatabaseService):
+        db_service._transaction_count += 1
+        self._logger = db_service.logger
+        self.transaction_id = db_service._transaction_count
+
+    def __enter__(self) -> int:
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug("Starting transaction %d", self.transaction_id)
+        return self.transaction_id
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        logger = self._logger
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if exc_type is None:
+            if debug:
+                logger.debug("Committing transaction %d", self.transaction_id)
+        elif issubclass(exc_type, Exception):
+            logger.error("Rolling back transaction %d: %s", self.transaction_id, exc)
+        if debug:
+            logger.debug("Ending transaction %d", self.transaction_id)
+        return False
+
+
 class CacheService(BaseService):
     """In-memory cache service."""
 
-    def __init__(self, config: AppConfig, ttl_seconds: int = 300):
+    __slots__ = ('_values', '_expiry', '_created', '_expiry_heap', '_ttl_seconds', 'max_items')
+
+    def __init__(self, config: AppConfig, ttl_seconds: int = 300, max_items: int = 10000):
         super().__init__(config)
-        self._cache: Dict[str, Dict[str, Any]] = {}
+        # Entry fields are stored in parallel mappings keyed by cache key;
+        # _values also tracks recency for LRU eviction.
+        self._values: "OrderedDict[str, Any]" = OrderedDict()
+        self._expiry: Dict[str, float] = {}
+        self._created: Dict[str, float] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
         self._ttl_seconds = ttl_seconds
+        self.max_items = max_items
 
-    def _is_expired(self, item: Dict[str, Any]) -> bool:
-        """Check if a cache item is expired."""
-        expiry = item.get('expiry')
-        if not expiry:
-            return False
-        return datetime.now() > expiry
+    def _remove(self, key: str) -> None:
+        """Drop every field stored for a key."""
+        del self._values[key]
+        del self._expiry[key]
+        del self._created[key]
+
+    def _compact_expiry_heap(self) -> None:
+        """Rebuild the expiry heap from live entries only."""
+        heap = [(expiry, key) for key, expiry in self._expiry.items()]
+        heapq.heapify(heap)
+        self._expiry_heap = heap
 
     def get(self, key: str) -> Optional[Any]:
         """Get a value from cache."""
-        if key not in self._cache:
+        expiry = self._expiry.get(key)
+        if expiry is None:
             return None
 
-        item = self._cache[key]
-        if self._is_expired(item):
-            del self._cache[key]
+        if expiry <= time.monotonic():
+            self._remove(key)
             return None
 
-        return item['value']
+        values = self._values
+        values.move_to_end(key)
+        return values[key]
 
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """Set a value in cache."""
-        ttl = ttl or self._ttl_seconds
-        expiry = datetime.now() + timedelta(seconds=ttl)
-
-        self._cache[key] = {
-            'value': value,
-            'expiry': expiry,
-            'created_at': datetime.now()
-        }
-
-        self.logger.debug("Cached item with key: %s", key)
+        values = self._values
+        expiries = self._expiry
+        created = self._created
+        heap = self._expiry_heap
+        log = self.logger
+        now = time.monotonic()
+        expiry = now + (ttl or self._ttl_seconds)
+
+        values[key] = value
+        expiries[key] = expiry
+        created[key] = now
+        values.move_to_end(key)
+        heapq.heappush(heap, (expiry, key))
+
+        # Overwrites, deletes, and evictions leave stale heap entries behind;
+        # rebuild from the live expiries once they dominate the heap.
+        if len(heap) > max(2 * len(expiries), _HEAP_COMPACT_MIN):
+            self._compact_expiry_heap()
+
+        # Evict least recently used entries; their heap entries go stale.
+        max_items = self.max_items
+        while len(values) > max_items:
+            evicted_key, _ = values.popitem(last=False)
+            del expiries[evicted_key]
+            del created[evicted_key]
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Evicted cache key: %s", evicted_key)
+
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Cached item with key: %s", key)
 
     def delete(self, key: str) -> bool:
         """Delete a value from cache."""
-        if key in self._cache:
-            del self._cache[key]
-            self.logger.debug("Deleted cache key: %s", key)
+        if key in self._values:
+            self._remove(key)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Deleted cache key: %s", key)
             return True
         return False
 
     def clear(self) -> None:
         """Clear all cache entries."""
-        self._cache.clear()
+        self._values.clear()
+        self._expiry.clear()
+        self._created.clear()
+        self._expiry_heap.clear()
         self.logger.info("Cache cleared")
 
     def cleanup_expired(self) -> int:
         """Remove expired items from cache."""
-        expired_keys = [
-            key for key, item in self._cache.items()
-            if self._is_expired(item)
-        ]
+        now = time.monotonic()
+        heap = self._expiry_heap
+        expiries = self._expiry
+        removed = 0
 
-        for key in expired_keys:
-            del self._cache[key]
+        while heap and heap[0][0] <= now:
+            expiry, key = heapq.heappop(heap)
+            # Skip heap entries left behind by overwrites or deletes.
+            if expiries.get(key) == expiry:
+                self._remove(key)
+                removed += 1
 
-        self.logger.info("Cleaned up %d expired cache entries", len(expired_keys))
-        return len(expired_keys)
+        self.logger.info("Cleaned up %d expired cache entries", removed)
+        return removed
 
 
 class APIService(BaseService):
     """API service for handling HTTP requests."""
 
+    __slots__ = ('db_service', 'cache_service', '_routes', '_middleware', '_middleware_chain')
+
     def __init__(self, config: AppConfig, db_service: DatabaseService, cache_service: CacheService):
         super().__init__(config)
         self.db_service = db_service
         self.cache_service = cache_service
-        self._routes: Dict[str, callable] = {}
-        self._middleware: List[callable] = []
+        # Routes and middleware are frozen while the service is initialized
+        self._routes: Mapping[Tuple[str, str], Callable] = {}
+        self._middleware: Union[List[Callable], Tuple[Callable, ...]] = []
+        self._middleware_chain: Optional[Callable] = None
 
-    def route(self, path: str, methods: List[str] = None):
-        """Decorator for registering routes."""
-        methods = methods or ['GET']
+    async def _setup(self) -> None:
+        """Freeze routes and middleware and compile the middleware chain."""
+        self._routes = MappingProxyType(self._routes)
+        self._middleware = tuple(self._middleware)
+        self._middleware_chain = self._compile_middleware()
+
+    async def _teardown(self) -> None:
+        """Reopen routes and middleware for registration."""
+        self._routes = dict(self._routes)
+        self._middleware = list(self._middleware)
 
+    def _compile_middleware(self) -> Callable:
+        """Build a coroutine that runs every registered middleware in order."""
+        middleware = tuple(self._middleware)
+
+        async def chain(method: str, path: str, data: Dict) -> None:
+            for middleware_func in middleware:
+                await middleware_func(method, path, data)
+
+        return chain
+
+    def route(self, path: str, methods: Tuple[str, ...] = ('GET',)):
+        """Decorator for registering routes."""
         def decorator(func):
-            self._routes[f"{','.join(methods)}:{path}"] = func
+            if self._initialized:
+                raise RuntimeError("Cannot register routes after API service initialization")
+            for method in methods:
+                self._routes[(method, path)] = func
             return func
 
         return decorator
 
     def middleware(self, func):
         """Decorator for registering middleware."""
+        if self._initialized:
+            raise RuntimeError("Cannot register middleware after API service initialization")
         self._middleware.append(func)
+        self._middleware_chain = None
         return func
 
     async def handle_request(self, method: str, path: str, data: Dict = None) -> Dict[str, Any]:
         """Handle an incoming request."""
-        route_key = f"{method}:{path}"
-
-        if route_key not in self._routes:
+        handler = self._routes.get((method, path))
+        if handler is None:
             return {"error": "Route not found", "status": 404}
 
+        chain = self._middleware_chain
+        if chain is None:
+            chain = self._middleware_chain = self._compile_middleware()
+
         # Apply middleware
-        for middleware_func in self._middleware:
-            try:
-                await middleware_func(method, path, data)
-            except Exception as e:
-                return {"error": f"Middleware error: {str(e)}", "status": 500}
+        try:
+            await chain(method, path, data)
+        except Exception as e:
+            return {"error": f"Middleware error: {str(e)}", "status": 500}
 
         # Execute route handler
         try:
-            handler = self._routes[route_key]
             result = await handler(data or {})
             return {"data": result, "status": 200}
         except Exception as e:
@@ -281,6 +501,8 @@ class APIService(BaseService):
 class Application:
     """Main application class orchestrating all services."""
 
+    __slots__ = ('config', 'logger', 'db_service', 'cache_service', 'api_service')
+
     def __init__(self, config_path: Optional[str] = None):
         self.config = self._load_config(config_path)
         self.logger = logging.getLogger(self.__class__.__name__)
@@ -300,13 +522,7 @@ class Application:
             self.logger.info("Loading config from %s", config_path)
 
         # Load from environment variables
-        return AppConfig(
-            debug=os.getenv('DEBUG', 'false').lower() == 'true',
-            host=os.getenv('HOST', 'localhost'),
-            port=int(os.getenv('PORT', '8080')),
-            database_url=os.getenv('DATABASE_URL', 'sqlite:///app.db'),
-            rate_limit=int(os.getenv('RATE_LIMIT', '100'))
-        )
+        return _config_from_env()
 
     def _setup_routes(self):
         """Setup API routes."""
@@ -318,10 +534,10 @@ class Application:
             return {
                 "status": "healthy" if db_healthy else "unhealthy",
                 "database": db_healthy,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _cached_iso_now()
             }
 
-        @self.api_service.route('/users', ['GET'])
+        @self.api_service.route('/users', ('GET',))
         async def get_users(data: Dict) -> List[Dict[str, Any]]:
             """Get users endpoint."""
             cached_users = self.cache_service.get('users')
@@ -332,7 +548,7 @@ class Application:
             self.cache_service.set('users', users, ttl=60)
             return users
 
-        @self.api_service.route('/users', ['POST'])
+        @self.api_service.route('/users', ('POST',))
         async def create_user(data: Dict) -> Dict[str, Any]:
             """Create user endpoint."""
             if not data.get('name'):
@@ -364,11 +580,15 @@ class Application:
 
     async def start(self) -> None:
         """Start the application."""
+        setup_logging()
         self.logger.info("Starting application")
 
         try:
-            await self.db_service.initialize()
-            await self.cache_service.initialize()
+            # The API service depends on the database and cache services
+            await asyncio.gather(
+                self.db_service.initialize(),
+                self.cache_service.initialize()
+            )
             await self.api_service.initialize()
 
             self.logger.info("Application started successfully on %s:%d",
@@ -383,11 +603,18 @@ class Application:
         """Stop the application."""
         self.logger.info("Stopping application")
 
-        await self.api_service.cleanup()
-        await self.cache_service.cleanup()
-        await self.db_service.cleanup()
+        results = await asyncio.gather(
+            self.api_service.cleanup(),
+            self.cache_service.cleanup(),
+            self.db_service.cleanup(),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.error("Error during cleanup: %s", result)
 
         self.logger.info("Application stopped")
+        shutdown_logging()
 
     async def run_server(self):
         """Run the application server (simplified)."""
@@ -423,10 +650,15 @@ async def main():
 
     except Exception as e:
         logger.error("Application error: %s", e)
-        sys.exit(1)
+        await app.stop()
+        # Flush output and exit without interpreter finalization
+        for handler in _log_handlers:
+            handler.flush()
+        sys.stdout.flush()
+        os._exit(1)
     finally:
         await app.stop()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main(), debug=False)
\ No newline at end of file
@@ -10,21 +10,18 @@ This module contains:
 
 from __future__ import annotations
 
-import re
-import uuid
+import importlib.util
+import secrets
+from itertools import islice
 from datetime import datetime, date
 from decimal import Decimal
 from enum import Enum, IntEnum
-from typing import Dict, List, Optional, Union, Any, ClassVar, Type, get_type_hints
+from types import MappingProxyType
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Tuple, Union, Any, ClassVar, Type, get_type_hints
 from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
 
-try:
-    from pydantic import BaseModel, Field, validator, root_validator
-    PYDANTIC_AVAILABLE = True
-except ImportError:
-    PYDANTIC_AVAILABLE = False
-    BaseModel = object
+PYDANTIC_AVAILABLE = importlib.util.find_spec('pydantic') is not None
 
 
 class UserStatus(Enum):
@@ -55,6 +52,62 @@ class Priority(Enum):
     URGENT = "urgent"
 
 
+# Decimal places kept in integer money amounts, enough for sub-cent prices
+_MONEY_PLACES = 6
+_CENT = Decimal('0.01')
+
+
+def _is_money_amount(amount: Decimal) -> bool:
+    """Return True for finite amounts with at most _MONEY_PLACES decimal places."""
+    if not amount.is_finite():
+        return False
+    _, digits, exponent = amount.as_tuple()
+    excess_places = -_MONEY_PLACES - exponent
+    # Trailing zeros beyond the allowed places do not change the value
+    return excess_places <= 0 or not any(digits[-excess_places:])
+
+
+def _to_money_units(amount: Decimal) -> int:
+    """Convert a currency amount to integer money units (10**-_MONEY_PLACES)."""
+    return int(amount.scaleb(_MONEY_PLACES))
+
+
+def _from_money_units(units: int) -> Decimal:
+    """Convert integer money units back to a currency amount.
+
+    Whole-cent amounts come back with two decimal places; sub-cent amounts
+    keep only the digits they need.
+    """
+    amount = Decimal(units).scaleb(-_MONEY_PLACES)
+    cents = amount.quantize(_CENT)
+    return cents if cents == amount else amount.normalize()
+
+
+# Canonical read-only product snapshots shared by order items with identical contents
+_SNAPSHOT_CACHE: Dict[frozenset, Mapping[str, Any]] = {}
+_SNAPSHOT_CACHE_MAX = 10000
+
+
+def _intern_snapshot(snapshot: Mapping[str, Any]) -> Mapping[str, Any]:
+    """Return a shared read-only copy of ``snapshot``.
+
+    The caller's mapping is copied, never stored, so later changes to it do
+    not reach other order items. Snapshots with unhashable values, or
+    arriving once the cache is full, get a private read-only copy.
+    """
+    frozen = MappingProxyType(dict(snapshot))
+    try:
+        key = frozenset((k, type(v), v) for k, v in frozen.items())
+    except TypeError:
+        return frozen
+    cached = _SNAPSHOT_CACHE.get(key)
+    if cached is not None:
+        return cached
+    if len(_SNAPSHOT_CACHE) < _SNAPSHOT_CACHE_MAX:
+        _SNAPSHOT_CACHE[key] = frozen
+    return frozen
+
+
 # Base classes for ORM-like functionality
 
 class Field:
@@ -75,19 +128,121 @@ class Field:
         self.unique = unique
         self.default = default
         self.max_length = max_length
+        self._check = self._build_check()
+
+    def _build_check(self) -> Callable[[Any], bool]:
+        """Build a validator specialized for this field's settings."""
+        field_type = self.field_type
+        max_length = self.max_length
+
+        if max_length:
+            def check_type(value):
+                return isinstance(value, field_type) and not (
+                    isinstance(value, str) and len(value) > max_length
+                )
+        else:
+            def check_type(value):
+                return isinstance(value, field_type)
+
+        if self.nullable:
+            return lambda value: value is None or check_type(value)
+        if max_length:
+            return lambda value: value is not None and check_type(value)
+        return lambda value: value is not None and isinstance(value, field_type)
 
     def validate(self, value: Any) -> bool:
         """Validate field value."""
-        if value is None and not self.nullable:
-            return False
+        return self._check(value)
 
-        if value is not None and not isinstance(value, self.field_type):
-            return False
 
-        if self.max_length and isinstance(value, str) and len(value) > self.max_length:
-            return False
+class MoneyField(Field):
+    """Decimal currency field stored as integer money units.
 
-        return True
+    The field stays on the model class as a descriptor over a private integer
+    slot, so amounts can be summed without Decimal arithmetic while reading
+    and assigning them still uses Decimal. Values must be finite and have at
+    most ``_MONEY_PLACES`` decimal places.
+    """
+
+    def __init__(self, **kwargs):
+        self.name = self.slot_name = None
+        super().__init__(Decimal, **kwargs)
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.slot_name = f'_{name}_units'
+
+    def _build_check(self) -> Callable[[Any], bool]:
+        check = super()._build_check()
+        return lambda value: check(value) and (value is None or _is_money_amount(value))
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        units = getattr(instance, self.slot_name)
+        return None if units is None else _from_money_units(units)
+
+    def __set__(self, instance, value):
+        if not self._check(value):
+            raise ValueError(f"Invalid value for field {self.name}: {value}")
+        setattr(instance, self.slot_name, None if value is None else _to_money_units(value))
+
+
+# Sentinel for fields missing from constructor kwargs
+_MISSING = object()
+
+
+def _compile_field_init(field_specs: Tuple[Tuple[str, Any, bool, Type, Optional[int]], ...],
+                        signature: str) -> Callable:
+    """Generate a straight-line initializer for the given field specs.
+
+    The generated body applies the same checks as ``Field.validate`` to each
+    field in turn and stores the result directly on the instance. Callable
+    defaults such as ``datetime.now`` or ``list`` are invoked per instance.
+    """
+    namespace: Dict[str, Any] = {'_MISSING': _MISSING}
+    lines = [f'def {signature}:', '    get = kwargs.get']
+    has_now = False
+    for index, (field_name, default, nullable, field_type, max_length) in enumerate(field_specs):
+        default_name = f'_default_{index}'
+        type_name = f'_type_{index}'
+        namespace[default_name] = default
+        namespace[type_name] = field_type
+
+        if default == datetime.now:
+            # Timestamp defaults share a single clock read per instance
+            if not has_now:
+                lines.append('    now = None')
+                has_now = True
+            lines.append(f'    value = get({field_name!r}, _MISSING)')
+            lines.append('    if value is _MISSING:')
+            lines.append('        if now is None:')
+            lines.append(f'            now = {default_name}()')
+            lines.append('        value = now')
+        elif callable(default):
+            lines.append(f'    value = get({field_name!r}, _MISSING)')
+            lines.append('    if value is _MISSING:')
+            lines.append(f'        value = {default_name}()')
+        else:
+            lines.append(f'    value = get({field_name!r}, {default_name})')
+
+        invalid = f'not isinstance(value, {type_name})'
+        if max_length:
+            if field_type is str:
+                invalid += f' or len(value) > {max_length}'
+            else:
+                invalid += f' or (isinstance(value, str) and len(value) > {max_length})'
+        if nullable:
+            invalid = f'value is not None and ({invalid})'
+        else:
+            invalid = f'value is None or {invalid}'
+
+        lines.append(f'    if {invalid}:')
+        lines.append(f'        raise ValueError(f"Invalid value for field {field_name}: {{value}}")')
+        lines.append(f'    self.{field_name} = value')
+
+    exec('\n'.join(lines), namespace)
+    return namespace[signature.split('(')[0]]
 
 
 class ModelMeta(type):
@@ -95,26 +250,49 @@ class ModelMeta(type):
 
     def __new__(mcs, name, bases, attrs):
         fields = {}
+        slots = []
         for key, value in list(attrs.items()):
             if isinstance(value, Field):
                 fields[key] = value
-                attrs.pop(key)
+                if isinstance(value, MoneyField):
+                    # Descriptor fields stay on the class over their own slot
+                    value.__set_name__(None, key)
+                    slots.append(value.slot_name)
+                else:
+                    attrs.pop(key)
+                    slots.append(key)
 
         attrs['_fields'] = fields
+        # Store field values (plus any declared private attributes) in slots
+        attrs['__slots__'] = tuple(slots) + tuple(attrs.pop('__extra_slots__', ()))
+        # Flattened per-field settings used to generate the initializers
+        field_specs = tuple(
+            (field_name, field_obj.default, field_obj.nullable,
+             field_obj.field_type, field_obj.max_length)
+            for field_name, field_obj in fields.items()
+        )
+        attrs['_field_specs'] = field_specs
+        attrs['_init_fields'] = _compile_field_init(
+            field_specs, '_init_fields(self, kwargs)'
+        )
+        # Models without a custom __init__ get the specialized one directly
+        if '__init__' not in attrs:
+            attrs['__init__'] = _compile_field_init(
+                field_specs, '__init__(self, **kwargs)'
+            )
         return super().__new__(mcs, name, bases, attrs)
 
 
 class BaseModel(metaclass=ModelMeta):
     """Base class for all models."""
 
+    __slots__ = ()
+
     _fields: ClassVar[Dict[str, Field]] = {}
+    _field_specs: ClassVar[Tuple[Tuple[str, Any, bool, Type, Optional[int]], ...]] = ()
 
     def __init__(self, **kwargs):
-        for field_name, field_obj in self._fields.items():
-            value = kwargs.get(field_name, field_obj.default)
-            if not field_obj.validate(value):
-                raise ValueError(f"Invalid value for field {field_name}: {value}")
-            setattr(self, field_name, value)
+        self._init_fields(kwargs)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert model to dictionary."""
@@ -133,7 +311,7 @@ class BaseModel(metaclass=ModelMeta):
         errors = []
         for field_name, field_obj in self._fields.items():
             value = getattr(self, field_name, None)
-            if not field_obj.validate(value):
+            if not field_obj._check(value):
                 errors.append(f"Invalid value for {field_name}")
         return errors
 
@@ -143,11 +321,33 @@ class BaseModel(metaclass=ModelMeta):
         return f"{class_name}({attrs})"
 
 
+def _cached_full_name(model: BaseModel) -> str:
+    """Return "first last" for a model, reusing the last result.
+
+    The cache stores the name strings it was built from and is reused only
+    while both attributes still refer to those same objects, so assigning
+    either name invalidates it without needing setters.
+    """
+    first_name = model.first_name
+    last_name = model.last_name
+    try:
+        cached_first, cached_last, full_name = model._full_name_cache
+        if cached_first is first_name and cached_last is last_name:
+            return full_name
+    except AttributeError:
+        pass
+    full_name = f"{first_name} {last_name}"
+    model._full_name_cache = (first_name, last_name, full_name)
+    return full_name
+
+
 # Model definitions
 
 class User(BaseModel):
     """User model with validation and relationships."""
 
+    __extra_slots__ = ('_orders', '_profile', '_full_name_cache')
+
     id = Field(int, primary_key=True)
     username = Field(str, nullable=False, unique=True, max_length=50)
     email = Field(str, nullable=False, unique=True, max_length=255)
@@ -168,7 +368,7 @@ class User(BaseModel):
     @property
     def full_name(self) -> str:
         """Get user's full name."""
-        return f"{self.first_name} {self.last_name}"
+        return _cached_full_name(self)
 
     @property
     def is_active(self) -> bool:
@@ -190,6 +390,10 @@ class User(BaseModel):
         """Get user's orders."""
         return self._orders.copy()
 
+    def iter_orders(self) -> Iterator[Order]:
+        """Iterate over user's orders without copying them."""
+        return iter(self._orders)
+
     def add_order(self, order: Order) -> None:
         """Add an order to the user."""
         if order not in self._orders:
@@ -228,6 +432,8 @@ class UserProfile(BaseModel):
 class Category(BaseModel):
     """Product category model."""
 
+    __extra_slots__ = ('_children', '_products')
+
     id = Field(int, primary_key=True)
     name = Field(str, nullable=False, unique=True, max_length=100)
     description = Field(str, nullable=True, max_length=500)
@@ -252,6 +458,10 @@ class Category(BaseModel):
         """Get child categories."""
         return self._children.copy()
 
+    def iter_children(self) -> Iterator[Category]:
+        """Iterate over child categories without copying them."""
+        return iter(self._children)
+
     def add_child(self, child_category: Category) -> None:
         """Add a child category."""
         if child_category not in self._children:
@@ -335,6 +545,13 @@ class Product(BaseModel):
 class Order(BaseModel):
     """Order model with comprehensive order management."""
 
+    __extra_slots__ = ('_items', '_items_by_product', '_shipping_address', '_billing_address')
+
+    # Status thresholds bound on the class for the status properties
+    _SHIPPED: ClassVar[OrderStatus] = OrderStatus.SHIPPED
+    _DELIVERED: ClassVar[OrderStatus] = OrderStatus.DELIVERED
+    _PROCESSING: ClassVar[OrderStatus] = OrderStatus.PROCESSING
+
     id = Field(int, primary_key=True)
     order_number = Field(str, nullable=False, unique=True, max_length=50)
     user_id = Field(int, nullable=False)
@@ -357,6 +574,8 @@ class Order(BaseModel):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._items: List[OrderItem] = []
+        # Items per product id, in insertion order, for O(1) lookup on removal
+        self._items_by_product: Dict[int, List[OrderItem]] = {}
         self._shipping_address: Optional[Address] = None
         self._billing_address: Optional[Address] = None
 
@@ -364,7 +583,7 @@ class Order(BaseModel):
     def generate_order_number(cls) -> str:
         """Generate a unique order number."""
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        random_suffix = str(uuid.uuid4().hex)[:6].upper()
+        random_suffix = secrets.token_hex(3).upper()
         return f"ORD-{timestamp}-{random_suffix}"
 
     @property
@@ -375,17 +594,17 @@ class Order(BaseModel):
     @property
     def is_shipped(self) -> bool:
         """Check if order is shipped."""
-        return self.status.value >= OrderStatus.SHIPPED.value
+        return self.status >= self._SHIPPED
 
     @property
     def is_delivered(self) -> bool:
         """Check if order is delivered."""
-        return self.status == OrderStatus.DELIVERED
+        return self.status == self._DELIVERED
 
     @property
     def is_cancellable(self) -> bool:
         """Check if order can be cancelled."""
-        return self.status.value <= OrderStatus.PROCESSING.value
+        return self.status <= self._PROCESSING
 
     def add_item(self, product_id: int, quantity: int, unit_price: Decimal) -> OrderItem:
         """Add an item to the order."""
@@ -396,23 +615,32 @@ class Order(BaseModel):
             unit_price=unit_price
         )
         self._items.append(item)
+        self._items_by_product.setdefault(product_id, []).append(item)
         self._recalculate_totals()
         return item
 
     def remove_item(self, product_id: int) -> bool:
         """Remove an item from the order."""
-        for i, item in enumerate(self._items):
-            if item.product_id == product_id:
-                del self._items[i]
-                self._recalculate_totals()
-                return True
-        return False
+        product_items = self._items_by_product.get(product_id)
+        if not product_items:
+            return False
+        item = product_items.pop(0)
+        if not product_items:
+            del self._items_by_product[product_id]
+        self._items.remove(item)
+        self._recalculate_totals()
+        return True
 
     def _recalculate_totals(self) -> None:
         """Recalculate order totals."""
-        self.subtotal = sum(item.line_total for item in self._items)
+        items = self._items
+        subtotal_units = 0
+        for item in items:
+            subtotal_units += item._line_total_units
+        subtotal = _from_money_units(subtotal_units)
+        self.subtotal = subtotal
         self.total_amount = (
-            self.subtotal + self.tax_amount +
+            subtotal + self.tax_amount +
             self.shipping_amount - self.discount_amount
         )
 
@@ -420,35 +648,58 @@ class Order(BaseModel):
         """Get order items."""
         return self._items.copy()
 
+    def iter_items(self) -> Iterator[OrderItem]:
+        """Iterate over order items without copying them."""
+        return iter(self._items)
+
 
 class OrderItem(BaseModel):
-    """Individual item within an order."""
+    """Individual item within an order.
+
+    ``unit_price`` and ``line_total`` are money fields stored as integer
+    money units, so order totals are summed without Decimal arithmetic and
+    never disagree with the item amounts.
+
+    ``product_snapshot`` is read-only: identical snapshots are shared between
+    items as one ``MappingProxyType``, so build a new mapping and assign it
+    to change an item's snapshot. ``to_dict()`` returns a plain dict copy.
+    """
 
     id = Field(int, primary_key=True)
     order_id = Field(int, nullable=False)
     product_id = Field(int, nullable=False)
     quantity = Field(int, nullable=False)
-    unit_price = Field(Decimal, nullable=False)
-    line_total = Field(Decimal, nullable=False)
-    product_snapshot = Field(dict, default=dict)  # Store product data at time of order
+    unit_price = MoneyField(nullable=False)
+    line_total = MoneyField(nullable=False)
+    product_snapshot = Field(Mapping, default=dict)  # Store product data at time of order (shared, read-only)
     created_at = Field(datetime, default=datetime.now)
 
     def __init__(self, **kwargs):
         if 'line_total' not in kwargs and 'quantity' in kwargs and 'unit_price' in kwargs:
             kwargs['line_total'] = Decimal(str(kwargs['quantity'])) * kwargs['unit_price']
+        if kwargs.get('product_snapshot'):
+            kwargs['product_snapshot'] = _intern_snapshot(kwargs['product_snapshot'])
         super().__init__(**kwargs)
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert model to dictionary."""
+        data = super().to_dict()
+        data['product_snapshot'] = dict(self.product_snapshot)
+        return data
+
     def update_quantity(self, new_quantity: int) -> None:
         """Update item quantity and recalculate total."""
         if new_quantity <= 0:
             raise ValueError("Quantity must be positive")
         self.quantity = new_quantity
-        self.line_total = Decimal(str(self.quantity)) * self.unit_price
+        self._line_total_units = new_quantity * self._unit_price_units
 
 
 class Address(BaseModel):
     """Address model for shipping and billing."""
 
+    __extra_slots__ = ('_full_name_cache',)
+
     id = Field(int, primary_key=True)
     first_name = Field(str, nullable=False, max_length=100)
     last_name = Field(str, nullable=False, max_length=100)
@@ -467,7 +718,7 @@ class Address(BaseModel):
     @property
     def full_name(self) -> str:
         """Get full name."""
-        return f"{self.first_name} {self.last_name}"
+        return _cached_full_name(self)
 
     def format_address(self, single_line: bool = False) -> str:
         """Format address as string."""
@@ -487,51 +738,26 @@ class Address(BaseModel):
         return separator.join(parts)
 
 
-# Pydantic models for API serialization (if Pydantic is available)
-if PYDANTIC_AVAILABLE:
-
-    class UserCreateRequest(BaseModel):
-        """Pydantic model for user creation request."""
-        username: str = Field(..., min_length=3, max_length=50)
-        email: str = Field(..., regex=r'^[\w\.-]+@[\w\.-]+\.\w+$')
-        first_name: str = Field(..., min_length=1, max_length=100)
-        last_name: str = Field(..., min_length=1, max_length=100)
-        password: str = Field(..., min_length=8)
-
-        @validator('username')
-        def username_alphanumeric(cls, v):
-            assert v.isalnum(), 'Username must be alphanumeric'
-            return v
-
-        @validator('password')
-        def validate_password_strength(cls, v):
-            if not re.search(r'[A-Z]', v):
-                raise ValueError('Password must contain uppercase letter')
-            if not re.search(r'[a-z]', v):
-                raise ValueError('Password must contain lowercase letter')
-            if not re.search(r'\d', v):
-                raise ValueError('Password must contain digit')
-            return v
-
-    class ProductResponse(BaseModel):
-        """Pydantic model for product API response."""
-        id: int
-        sku: str
-        name: str
-        description: Optional[str]
-        price: Decimal
-        category_id: int
-        in_stock: bool
-        stock_quantity: int
-        is_featured: bool
-        tags: List[str]
-        created_at: datetime
-
-        class Config:
-            json_encoders = {
-                Decimal: lambda v: float(v),
-                datetime: lambda v: v.isoformat()
-            }
+# Pydantic models for API serialization live in api_schemas and are
+# imported on first access (PEP 562) so importing this module does not
+# pay for Pydantic startup.
+_API_SCHEMA_NAMES = frozenset({'UserCreateRequest', 'ProductResponse'})
+
+
+def __getattr__(name: str) -> Any:
+    if name in _API_SCHEMA_NAMES and PYDANTIC_AVAILABLE:
+        # Resolve the sibling module relative to this one when imported as
+        # part of a package, rather than relying on sys.path
+        try:
+            api_schemas = importlib.import_module(
+                f'{__package__}.api_schemas' if __package__ else 'api_schemas'
+            )
+        except ImportError:
+            raise AttributeError(
+                f"module {__name__!r} has no attribute {name!r}"
+            ) from None
+        return getattr(api_schemas, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Repository pattern for data access
@@ -576,17 +802,33 @@ class InMemoryRepository(Repository):
         return self._data.get(id)
 
     async def create(self, entity: BaseModel) -> BaseModel:
+        now = datetime.now()
         entity.id = self._next_id
-        entity.created_at = datetime.now()
-        entity.updated_at = datetime.now()
+        entity.created_at = now
+        if 'updated_at' in entity._fields:
+            entity.updated_at = now
         self._data[entity.id] = entity
         self._next_id += 1
         return entity
 
+    async def bulk_create(self, entities: List[BaseModel]) -> List[BaseModel]:
+        """Create several entities with one shared timestamp."""
+        now = datetime.now()
+        data = self._data
+        for entity_id, entity in enumerate(entities, self._next_id):
+            entity.id = entity_id
+            entity.created_at = now
+            if 'updated_at' in entity._fields:
+                entity.updated_at = now
+            data[entity_id] = entity
+        self._next_id += len(entities)
+        return entities
+
     async def update(self, entity: BaseModel) -> BaseModel:
         if entity.id not in self._data:
             raise ValueError(f"Entity with id {entity.id} not found")
-        entity.updated_at = datetime.now()
+        if 'updated_at' in entity._fields:
+            entity.updated_at = datetime.now()
         self._data[entity.id] = entity
         return entity
 
@@ -597,8 +839,7 @@ class InMemoryRepository(Repository):
         return False
 
     async def list(self, limit: int = 100, offset: int = 0) -> List[BaseModel]:
-        items = list(self._data.values())
-        return items[offset:offset + limit]
+        return list(islice(self._data.values(), offset, offset + limit))
 
     async def count(self) -> int:
         """Count total entities."""
@@ -12,22 +12,102 @@ This module contains:
 """
 
 import asyncio
+import bisect
+from array import array
+import heapq
+import importlib.util
+import itertools
 import json
 import logging
+import re
+import secrets
 import smtplib
+import string
+import threading
 import time
 from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Dict, List, Optional, Any, Union, Tuple, Protocol
+from typing import Awaitable, Callable, DefaultDict, Dict, Iterable, List, Optional, Any, Set, Union, Tuple, Protocol
 from dataclasses import dataclass, field
 from enum import Enum
+from operator import attrgetter
 from pathlib import Path
-import uuid
 
 logger = logging.getLogger(__name__)
 
+AIOSMTPLIB_AVAILABLE = importlib.util.find_spec('aiosmtplib') is not None
+
+# Long-lived SMTP connections shared by concurrent sends
+_SMTP_POOL_SIZE = 4
+
+# Accepted payment range in cents ($1.00 to $10,000)
+MIN_PAYMENT_AMOUNT = 100
+MAX_PAYMENT_AMOUNT = 1_000_000
+
+# Concurrent sends allowed by send_bulk_emails
+_BULK_EMAIL_CONCURRENCY = 10
+
+_EVENT_TIMESTAMP_NS = attrgetter('timestamp_ns')
+
+_NS_PER_DAY = 86_400 * 1_000_000_000
+
+_STRIP_TAGS_RE = re.compile(r'<[^>]+>')
+_TOKEN_RE = re.compile(r"\w+")
+# A leading '*' marks a substring term, a trailing '*' a prefix term
+_QUERY_TERM_RE = re.compile(r"(\*?)(\w+)(\*?)")
+
+# Terminal marker in trie nodes; never a valid token character
+_TRIE_END = ''
+
+
+# Timestamp prefix of the last ID handed out by _new_id
+_last_id_ns = 0
+_id_lock = threading.Lock()
+
+
+def _new_id() -> str:
+    """Time-ordered 32-hex-char ID: nanosecond timestamp plus 64 random bits.
+
+    The timestamp prefix is strictly increasing within the process, even if
+    the wall clock repeats a value or steps backwards.
+    """
+    global _last_id_ns
+    with _id_lock:
+        _last_id_ns = max(_last_id_ns + 1, time.time_ns())
+        timestamp_ns = _last_id_ns
+    return f"{timestamp_ns:016x}{secrets.token_hex(8)}"
+
+
+def _tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+_FORMATTER = string.Formatter()
+
+# (literal_text, field_name, format_spec, conversion) pieces of a template
+_CompiledTemplate = Tuple[Tuple[str, Optional[str], str, Optional[str]], ...]
+
+
+def _compile_template(source: str) -> Optional[_CompiledTemplate]:
+    """Parse a str.format-style template once into render pieces.
+
+    Returns None for templates using field syntax the piecewise renderer
+    does not handle (attribute or index lookups, positional fields, nested
+    fields in format specs); those are rendered with ``str.format``.
+    """
+    pieces = []
+    for literal, field_name, format_spec, conversion in _FORMATTER.parse(source):
+        if field_name is not None and (
+            not field_name.isidentifier() or '{' in (format_spec or '')
+        ):
+            return None
+        pieces.append((literal, field_name, format_spec or '', conversion))
+    return tuple(pieces)
+
 
 class ServiceError(Exception):
     """Base exception for service errors."""
@@ -149,7 +229,7 @@ class EmailTemplate(Enum):
 
 
 # Data classes
-@dataclass
+@dataclass(slots=True)
 class EmailMessage:
     """Email message data structure."""
     to: str
@@ -164,10 +244,10 @@ class EmailMessage:
     template_data: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class Notification:
     """Notification data structure."""
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = field(default_factory=_new_id)
     type: NotificationType = NotificationType.EMAIL
     recipient: str = ""
     title: str = ""
@@ -180,11 +260,11 @@ class Notification:
     max_retries: int = 3
 
 
-@dataclass
+@dataclass(slots=True)
 class PaymentIntent:
     """Payment intent data structure."""
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
-    amount: int  # Amount in cents
+    id: str = field(default_factory=_new_id)
+    amount: int = field(kw_only=True)  # Amount in cents
     currency: str = "usd"
     payment_method: str = ""
     customer_id: Optional[str] = None
@@ -195,7 +275,7 @@ class PaymentIntent:
     updated_at: datetime = field(default_factory=datetime.now)
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchResult:
     """Search result data structure."""
     id: str
@@ -208,31 +288,31 @@ class SearchResult:
     highlighted_content: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class AnalyticsEvent:
     """Analytics event data structure."""
     event_name: str
     user_id: Optional[str] = None
     session_id: Optional[str] = None
     properties: Dict[str, Any] = field(default_factory=dict)
-    timestamp: datetime = field(default_factory=datetime.now)
+    # Wall-clock nanoseconds; converted to datetime only when read
+    timestamp_ns: int = field(default_factory=time.time_ns)
     ip_address: Optional[str] = None
     user_agent: Optional[str] = None
 
+    @property
+    def timestamp(self) -> datetime:
+        """Event time as a local datetime."""
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9)
+
 
 # Service implementations
 class EmailService:
     """Email service for sending emails through SMTP."""
 
-    def __init__(self, config: EmailConfig):
-        self.config = config
-        self.template_cache: Dict[EmailTemplate, str] = {}
-        self._load_templates()
-
-    def _load_templates(self):
-        """Load email templates from files or define them inline."""
-        # In a real app, these would be loaded from template files
-        self.template_cache[EmailTemplate.WELCOME] = """
+    # In a real app, these would be loaded from template files
+    _TEMPLATE_SOURCES: Dict[EmailTemplate, str] = {
+        EmailTemplate.WELCOME: """
         <html>
         <body>
             <h1>Welcome {name}!</h1>
@@ -240,9 +320,8 @@ class EmailService:
             <p>Your username is: {username}</p>
         </body>
         </html>
-        """
-
-        self.template_cache[EmailTemplate.PASSWORD_RESET] = """
+        """,
+        EmailTemplate.PASSWORD_RESET: """
         <html>
         <body>
             <h1>Password Reset Request</h1>
@@ -252,9 +331,8 @@ class EmailService:
             <p>This link expires in 24 hours.</p>
         </body>
         </html>
-        """
-
-        self.template_cache[EmailTemplate.ORDER_CONFIRMATION] = """
+        """,
+        EmailTemplate.ORDER_CONFIRMATION: """
         <html>
         <body>
             <h1>Order Confirmation</h1>
@@ -267,32 +345,93 @@ class EmailService:
             </ul>
         </body>
         </html>
-        """
+        """,
+    }
+
+    def __init__(self, config: EmailConfig):
+        self.config = config
+        # Per-instance copy of the template sources; registering or replacing
+        # a template here leaves other instances alone. Compiling is lazy.
+        self.template_cache: Dict[EmailTemplate, str] = dict(self._TEMPLATE_SOURCES)
+        # Sources compiled on first use, with the source each was built from
+        self._compiled_templates: Dict[EmailTemplate, Tuple[str, Optional[_CompiledTemplate]]] = {}
+        # Slots hold a connected client or None until first use
+        self._smtp_pool: Optional[asyncio.Queue] = None
+        # Every open client, whether idle in the pool or checked out by a send
+        self._smtp_connections: Set[Any] = set()
+
+    def warm_up(self, templates: Iterable[EmailTemplate]):
+        """Compile the given templates ahead of the first send."""
+        for template in templates:
+            self._get_template(template)
+
+    def _get_template(self, template: EmailTemplate) -> Tuple[str, Optional[_CompiledTemplate]]:
+        """Return a template's source and pieces, compiling it on first access."""
+        source = self.template_cache.get(template)
+        if source is None:
+            raise EmailServiceError(f"Template {template.value} not found")
+        compiled = self._compiled_templates.get(template)
+        if compiled is None or compiled[0] is not source:
+            # First use, or the registered source was replaced since
+            compiled = self._compiled_templates[template] = (source, _compile_template(source))
+        return compiled
 
     def _render_template(self, template: EmailTemplate, data: Dict[str, Any]) -> str:
         """Render email template with data."""
-        if template not in self.template_cache:
-            raise EmailServiceError(f"Template {template.value} not found")
+        source, pieces = self._get_template(template)
 
-        template_content = self.template_cache[template]
         try:
-            return template_content.format(**data)
+            if pieces is None:
+                return source.format(**data)
+            parts = []
+            for literal, field_name, format_spec, conversion in pieces:
+                parts.append(literal)
+                if field_name is not None:
+                    value = data[field_name]
+                    if conversion:
+                        value = _FORMATTER.convert_field(value, conversion)
+                    parts.append(format(value, format_spec))
         except KeyError as e:
             raise EmailServiceError(f"Missing template variable: {e}")
+        return ''.join(parts)
+
+    def _render_memoized(
+        self,
+        template: EmailTemplate,
+        data: Dict[str, Any],
+        render_cache: Optional[Dict[Any, str]]
+    ) -> str:
+        """Render a template, reusing output for identical data in render_cache."""
+        if render_cache is None:
+            return self._render_template(template, data)
+        try:
+            # Type-tag values so equal-but-distinct values such as 25, 25.0
+            # and True, which render differently, get separate entries.
+            key = (template, frozenset((k, type(v), v) for k, v in data.items()))
+        except TypeError:
+            # Unhashable template data; render without memoizing
+            return self._render_template(template, data)
+        html_body = render_cache.get(key)
+        if html_body is None:
+            html_body = render_cache[key] = self._render_template(template, data)
+        return html_body
 
     async def send_email(self, message: EmailMessage) -> bool:
         """Send an email message."""
+        return await self._send_message(message, None)
+
+    async def _send_message(self, message: EmailMessage, render_cache: Optional[Dict[Any, str]]) -> bool:
+        """Build and send one message, memoizing renders in render_cache if given."""
         try:
             # Render template if specified
             body = message.body
             html_body = message.html_body
 
             if message.template:
-                html_body = self._render_template(message.template, message.template_data)
+                html_body = self._render_memoized(message.template, message.template_data, render_cache)
                 if not body:
                     # Create plain text version (simplified)
-                    import re
-                    body = re.sub(r'<[^>]+>', '', html_body)
+                    body = _STRIP_TAGS_RE.sub('', html_body)
 
             # Create message
             msg = MIMEMultipart('alternative')
@@ -318,40 +457,106 @@ class EmailService:
 
             # Send email
             await self._send_smtp(msg)
-            logger.info(f"Email sent successfully to {message.to}")
+            logger.info("Email sent successfully to %s", message.to)
             return True
 
         except Exception as e:
-            logger.error(f"Failed to send email to {message.to}: {e}")
+            logger.error("Failed to send email to %s: %s", message.to, e)
             raise EmailServiceError(f"Failed to send email: {e}")
 
     async def _send_smtp(self, message: MIMEMultipart):
         """Send email via SMTP."""
-        # Simulate async SMTP sending
-        await asyncio.sleep(0.1)
-
-        # In a real implementation, would use aiosmtplib or similar
-        logger.debug(f"Sending email via SMTP to {self.config.smtp_host}:{self.config.smtp_port}")
+        if not AIOSMTPLIB_AVAILABLE:
+            # Simulate async SMTP sending
+            await asyncio.sleep(0.1)
+            logger.debug("Sending email via SMTP to %s:%s", self.config.smtp_host, self.config.smtp_port)
+            return
+
+        pool = self._smtp_pool
+        if pool is None:
+            pool = self._smtp_pool = asyncio.Queue()
+            for _ in range(_SMTP_POOL_SIZE):
+                pool.put_nowait(None)
+
+        # The slot goes back to the pool it came from even if close() has
+        # replaced it meanwhile, and on cancellation as well as on errors
+        smtp = await pool.get()
+        sent = False
+        try:
+            if smtp is None or not smtp.is_connected:
+                if smtp is not None:
+                    self._discard_smtp(smtp)
+                    smtp = None
+                smtp = await self._connect_smtp()
+                self._smtp_connections.add(smtp)
+            await smtp.send_message(message)
+            sent = True
+        finally:
+            if not sent and smtp is not None:
+                # Drop the connection; the slot reconnects on next use
+                self._discard_smtp(smtp)
+                smtp = None
+            pool.put_nowait(smtp)
+
+    def _discard_smtp(self, smtp) -> None:
+        """Close a pooled SMTP connection without waiting for the server."""
+        self._smtp_connections.discard(smtp)
+        smtp.close()
+
+    async def _connect_smtp(self):
+        """Open and authenticate a pooled SMTP connection."""
+        import aiosmtplib
+
+        smtp = aiosmtplib.SMTP(
+            hostname=self.config.smtp_host,
+            port=self.config.smtp_port,
+            use_tls=self.config.use_ssl,
+            start_tls=self.config.use_tls and not self.config.use_ssl,
+            timeout=self.config.timeout
+        )
+        await smtp.connect()
+        if self.config.username:
+            await smtp.login(self.config.username, self.config.password)
+        logger.debug("Opened SMTP connection to %s:%s", self.config.smtp_host, self.config.smtp_port)
+        return smtp
+
+    async def close(self):
+        """Close pooled SMTP connections, including ones in use by a send."""
+        pool, self._smtp_pool = self._smtp_pool, None
+        connections, self._smtp_connections = self._smtp_connections, set()
+        idle = set()
+        while pool is not None and not pool.empty():
+            smtp = pool.get_nowait()
+            if smtp is not None:
+                idle.add(smtp)
+        for smtp in connections:
+            if smtp in idle and smtp.is_connected:
+                await smtp.quit()
+            else:
+                # Checked out mid-send; abort rather than interleave a QUIT
+                smtp.close()
 
     async def send_bulk_emails(self, messages: List[EmailMessage]) -> Dict[str, bool]:
         """Send multiple emails in bulk."""
-        results = {}
-
-        # Send emails in batches to avoid overwhelming the server
-        batch_size = 10
-        for i in range(0, len(messages), batch_size):
-            batch = messages[i:i + batch_size]
-            tasks = [self.send_email(msg) for msg in batch]
-            batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for msg, result in zip(batch, batch_results):
-                results[msg.to] = isinstance(result, bool) and result
-
-            # Small delay between batches
-            if i + batch_size < len(messages):
-                await asyncio.sleep(0.5)
+        # Bound in-flight sends to avoid overwhelming the server, without
+        # waiting for a whole batch to finish before starting the next
+        semaphore = asyncio.Semaphore(_BULK_EMAIL_CONCURRENCY)
+        # Blasts often share one body; render each distinct template/data once
+        render_cache: Dict[Any, str] = {}
+
+        async def send_one(msg: EmailMessage) -> bool:
+            async with semaphore:
+                return await self._send_message(msg, render_cache)
+
+        send_results = await asyncio.gather(
+            *(send_one(msg) for msg in messages), return_exceptions=True
+        )
 
-        return results
+        # send_email logs its own failures; report them as False here
+        return {
+            msg.to: isinstance(result, bool) and result
+            for msg, result in zip(messages, send_results)
+        }
 
 
 class PaymentService:
@@ -360,6 +565,14 @@ class PaymentService:
     def __init__(self, config: PaymentConfig):
         self.config = config
         self.payment_history: List[PaymentIntent] = []
+        self._payments_by_id: Dict[str, PaymentIntent] = {}
+        self._payments_by_customer: DefaultDict[Optional[str], List[PaymentIntent]] = defaultdict(list)
+
+    def _record_payment(self, intent: PaymentIntent) -> None:
+        """Append a processed intent to the history and its lookup indexes."""
+        self.payment_history.append(intent)
+        self._payments_by_id[intent.id] = intent
+        self._payments_by_customer[intent.customer_id].append(intent)
 
     async def create_payment_intent(
         self,
@@ -378,7 +591,7 @@ class PaymentService:
             metadata=metadata or {}
         )
 
-        logger.info(f"Created payment intent {intent.id} for {amount} {currency}")
+        logger.info("Created payment intent %s for %s %s", intent.id, amount, currency)
         return intent
 
     async def process_payment(self, intent: PaymentIntent, payment_method: str) -> PaymentIntent:
@@ -392,32 +605,31 @@ class PaymentService:
             await asyncio.sleep(1.0)  # Simulate API call delay
 
             # Simulate different outcomes based on amount
-            if intent.amount < 100:  # Less than $1.00
-                intent.status = PaymentStatus.FAILED
-                raise PaymentServiceError("Amount too small")
-            elif intent.amount > 1000000:  # More than $10,000
+            amount = intent.amount
+            if not MIN_PAYMENT_AMOUNT <= amount <= MAX_PAYMENT_AMOUNT:
                 intent.status = PaymentStatus.FAILED
-                raise PaymentServiceError("Amount exceeds limit")
-            else:
-                intent.status = PaymentStatus.SUCCEEDED
+                raise PaymentServiceError(
+                    "Amount too small" if amount < MIN_PAYMENT_AMOUNT else "Amount exceeds limit"
+                )
+            intent.status = PaymentStatus.SUCCEEDED
 
             intent.updated_at = datetime.now()
-            self.payment_history.append(intent)
+            self._record_payment(intent)
 
-            logger.info(f"Payment {intent.id} processed successfully")
+            logger.info("Payment %s processed successfully", intent.id)
             return intent
 
         except Exception as e:
             intent.status = PaymentStatus.FAILED
             intent.updated_at = datetime.now()
-            self.payment_history.append(intent)
+            self._record_payment(intent)
 
-            logger.error(f"Payment {intent.id} failed: {e}")
+            logger.error("Payment %s failed: %s", intent.id, e)
             raise PaymentServiceError(f"Payment processing failed: {e}")
 
     async def refund_payment(self, payment_id: str, amount: Optional[int] = None) -> Dict[str, Any]:
         """Refund a payment."""
-        payment = next((p for p in self.payment_history if p.id == payment_id), None)
+        payment = self._payments_by_id.get(payment_id)
         if not payment:
             raise PaymentServiceError(f"Payment {payment_id} not found")
 
@@ -430,7 +642,7 @@ class PaymentService:
 
         await asyncio.sleep(0.5)  # Simulate API call
 
-        refund_id = str(uuid.uuid4())
+        refund_id = _new_id()
         refund = {
             'id': refund_id,
             'payment_id': payment_id,
@@ -443,13 +655,13 @@ class PaymentService:
         if refund_amount == payment.amount:
             payment.status = PaymentStatus.REFUNDED
 
-        logger.info(f"Refund {refund_id} processed for payment {payment_id}")
+        logger.info("Refund %s processed for payment %s", refund_id, payment_id)
         return refund
 
     def get_payment_history(self, customer_id: Optional[str] = None) -> List[PaymentIntent]:
         """Get payment history."""
         if customer_id:
-            return [p for p in self.payment_history if p.customer_id == customer_id]
+            return list(self._payments_by_customer.get(customer_id, ()))
         return self.payment_history.copy()
 
 
@@ -460,6 +672,17 @@ class SearchService:
         self.config = config
         self.search_index: Dict[str, Dict[str, Any]] = {}
         self.search_analytics: List[Dict[str, Any]] = []
+        # token -> {doc_id: [title_count, content_count]}
+        self._inverted: Dict[str, Dict[str, List[int]]] = {}
+        self._doc_tokens: Dict[str, Set[str]] = {}
+        self._docs_by_type: Dict[str, Set[str]] = {}
+        # Order each document was first indexed in; breaks ties between
+        # equal scores the way a stable sort over search_index did
+        self._doc_order: Dict[str, int] = {}
+        self._next_order = itertools.count()
+        # Nested-dict trie over indexed tokens, plus 3-char windows into it
+        self._trie: Dict[str, Any] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
 
     def index_document(
         self,
@@ -471,6 +694,9 @@ class SearchService:
         url: Optional[str] = None
     ):
         """Index a document for searching."""
+        if doc_id in self.search_index:
+            self._unindex(doc_id)
+
         self.search_index[doc_id] = {
             'id': doc_id,
             'title': title,
@@ -482,13 +708,112 @@ class SearchService:
             'word_count': len(content.split())
         }
 
-        logger.debug(f"Indexed document {doc_id}: {title}")
+        inverted = self._inverted
+        tokens = set()
+        for field_index, text in enumerate((title, content)):
+            for token, count in Counter(_tokenize(text)).items():
+                postings = inverted.get(token)
+                if postings is None:
+                    postings = inverted[token] = {}
+                    self._add_token(token)
+                postings.setdefault(doc_id, [0, 0])[field_index] += count
+                tokens.add(token)
+        self._doc_tokens[doc_id] = tokens
+        self._docs_by_type.setdefault(doc_type, set()).add(doc_id)
+        if doc_id not in self._doc_order:
+            self._doc_order[doc_id] = next(self._next_order)
+
+        logger.debug("Indexed document %s: %s", doc_id, title)
+
+    def _unindex(self, doc_id: str) -> None:
+        """Drop a document's postings and metadata from the index."""
+        doc_data = self.search_index.pop(doc_id)
+        inverted = self._inverted
+        for token in self._doc_tokens.pop(doc_id):
+            postings = inverted[token]
+            del postings[doc_id]
+            if not postings:
+                del inverted[token]
+                self._remove_token(token)
+        same_type = self._docs_by_type[doc_data['type']]
+        same_type.discard(doc_id)
+        if not same_type:
+            del self._docs_by_type[doc_data['type']]
+
+    def _add_token(self, token: str) -> None:
+        """Insert a newly indexed token into the trie and trigram table."""
+        node = self._trie
+        for char in token:
+            node = node.setdefault(char, {})
+        node[_TRIE_END] = True
+        trigrams = self._trigrams
+        for i in range(len(token) - 2):
+            trigrams.setdefault(token[i:i + 3], set()).add(token)
+
+    def _remove_token(self, token: str) -> None:
+        """Remove a token that no longer has postings, pruning empty nodes."""
+        path = [self._trie]
+        for char in token:
+            path.append(path[-1][char])
+        del path[-1][_TRIE_END]
+        for depth in range(len(token), 0, -1):
+            if path[depth]:
+                break
+            del path[depth - 1][token[depth - 1]]
+        trigrams = self._trigrams
+        for i in range(len(token) - 2):
+            gram = token[i:i + 3]
+            holders = trigrams[gram]
+            holders.discard(token)
+            if not holders:
+                del trigrams[gram]
+
+    def _tokens_with_prefix(self, prefix: str) -> List[str]:
+        """Return all indexed tokens starting with prefix."""
+        node = self._trie
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        matches = []
+        stack = [(node, prefix)]
+        while stack:
+            node, text = stack.pop()
+            for char, child in node.items():
+                if char == _TRIE_END:
+                    matches.append(text)
+                else:
+                    stack.append((child, text + char))
+        return matches
+
+    def _tokens_containing(self, fragment: str) -> List[str]:
+        """Return all indexed tokens containing fragment (len >= 3)."""
+        trigrams = self._trigrams
+        grams = sorted(
+            (trigrams.get(fragment[i:i + 3], set()) for i in range(len(fragment) - 2)),
+            key=len
+        )
+        candidates = set(grams[0]).intersection(*grams[1:])
+        return [token for token in candidates if fragment in token]
+
+    def _expand_query(self, query: str) -> List[str]:
+        """Turn a query into index tokens, expanding prefix/substring terms."""
+        words = []
+        for leading, term, trailing in _QUERY_TERM_RE.findall(query.lower()):
+            if leading and len(term) >= 3:
+                words.extend(self._tokens_containing(term))
+            elif leading or trailing:
+                words.extend(self._tokens_with_prefix(term))
+            else:
+                words.append(term)
+        return words
 
     def remove_document(self, doc_id: str) -> bool:
         """Remove a document from the index."""
         if doc_id in self.search_index:
-            del self.search_index[doc_id]
-            logger.debug(f"Removed document {doc_id} from index")
+            self._unindex(doc_id)
+            del self._doc_order[doc_id]
+            logger.debug("Removed document %s from index", doc_id)
             return True
         return False
 
@@ -510,55 +835,153 @@ class SearchService:
                 'doc_type_filter': doc_type
             })
 
-        # Simple keyword-based search (in a real app, would use Elasticsearch, Solr, etc.)
-        query_words = query.lower().split()
-        results = []
-
-        for doc_id, doc_data in self.search_index.items():
-            # Apply document type filter
-            if doc_type and doc_data['type'] != doc_type:
-                continue
-
-            # Calculate relevance score
-            score = self._calculate_relevance_score(query_words, doc_data)
-
-            if score > 0:
-                result = SearchResult(
-                    id=doc_data['id'],
-                    title=doc_data['title'],
-                    content=doc_data['content'],
-                    score=score,
-                    type=doc_data['type'],
-                    url=doc_data['url'],
-                    metadata=doc_data['metadata'],
-                    highlighted_content=self._highlight_content(query_words, doc_data['content'])
-                )
-                results.append(result)
+        # Only documents containing at least one query word are scored
+        query_words = self._expand_query(query)
+        candidate_ids: Set[str] = set()
+        for word in query_words:
+            postings = self._inverted.get(word)
+            if postings:
+                candidate_ids.update(postings)
+
+        # Apply document type filter
+        if doc_type:
+            candidate_ids &= self._docs_by_type.get(doc_type, set())
+
+        index = self.search_index
+        paginated_results, total_count = self._top_results(
+            (
+                (doc_id, self._calculate_relevance_score(query_words, index[doc_id]))
+                for doc_id in candidate_ids
+            ),
+            self._highlight_pattern(query_words),
+            offset,
+            limit
+        )
 
-        # Sort by relevance score
-        results.sort(key=lambda x: x.score, reverse=True)
+        logger.info("Search query '%s' returned %s results", query, len(paginated_results))
+        return paginated_results, total_count
 
-        # Apply pagination
-        total_count = len(results)
-        paginated_results = results[offset:offset + limit]
+    async def fuzzy_search(
+        self,
+        query: str,
+        max_edits: int = 1,
+        limit: int = 10,
+        offset: int = 0,
+        doc_type: Optional[str] = None
+    ) -> Tuple[List[SearchResult], int]:
+        """Search allowing up to max_edits typos per query word."""
+        inverted = self._inverted
+        threshold = self.config.fuzzy_threshold
+        scores: Dict[str, float] = {}
+        matched_tokens: List[str] = []
+
+        for word in _tokenize(query):
+            for token, edits in self._tokens_within(word, max_edits).items():
+                similarity = 1 - edits / len(word)
+                if similarity < threshold:
+                    continue
+                matched_tokens.append(token)
+                for doc_id, counts in inverted[token].items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + (counts[0] * 3.0 + counts[1]) * similarity
+
+        if doc_type:
+            same_type = self._docs_by_type.get(doc_type, set())
+            scores = {doc_id: score for doc_id, score in scores.items() if doc_id in same_type}
+
+        index = self.search_index
+
+        def normalized():
+            for doc_id, score in scores.items():
+                word_count = index[doc_id]['word_count']
+                yield doc_id, score / (word_count / 100) if word_count > 0 else score
+
+        return self._top_results(normalized(), self._highlight_pattern(matched_tokens), offset, limit)
+
+    def _top_results(
+        self,
+        scored: Iterable[Tuple[str, float]],
+        highlight: Optional[re.Pattern],
+        offset: int,
+        limit: int
+    ) -> Tuple[List[SearchResult], int]:
+        """Keep the best offset + limit scores in a bounded min-heap.
 
-        logger.info(f"Search query '{query}' returned {len(paginated_results)} results")
-        return paginated_results, total_count
+        SearchResult objects and highlights are only built for the page
+        being returned; returns (page, total matching documents).
+        """
+        wanted = offset + limit
+        doc_order = self._doc_order
+        # Negated index order makes earlier documents win equal scores
+        top: List[Tuple[float, int, str]] = []
+        total_count = 0
+        for doc_id, score in scored:
+            if score <= 0:
+                continue
+            total_count += 1
+            entry = (score, -doc_order[doc_id], doc_id)
+            if len(top) < wanted:
+                heapq.heappush(top, entry)
+            elif top and entry > top[0]:
+                heapq.heapreplace(top, entry)
+        top.sort(reverse=True)
+
+        index = self.search_index
+        results = []
+        for score, _, doc_id in top[offset:]:
+            doc_data = index[doc_id]
+            results.append(SearchResult(
+                id=doc_data['id'],
+                title=doc_data['title'],
+                content=doc_data['content'],
+                score=score,
+                type=doc_data['type'],
+                url=doc_data['url'],
+                metadata=doc_data['metadata'],
+                highlighted_content=self._highlight_content(highlight, doc_data['content'])
+            ))
+        return results, total_count
+
+    def _tokens_within(self, word: str, max_edits: int) -> Dict[str, int]:
+        """Walk the trie returning tokens within max_edits of word.
+
+        Carries one Levenshtein DP row per trie node and prunes a subtree
+        once every cell exceeds max_edits, so first-character edits are
+        explored without visiting the whole trie.
+        """
+        matches: Dict[str, int] = {}
+        word_len = len(word)
+        stack = [(self._trie, '', list(range(word_len + 1)))]
+        while stack:
+            node, text, row = stack.pop()
+            for char, child in node.items():
+                if char == _TRIE_END:
+                    if row[-1] <= max_edits:
+                        matches[text] = row[-1]
+                    continue
+                next_row = [row[0] + 1]
+                for i in range(1, word_len + 1):
+                    next_row.append(min(
+                        next_row[i - 1] + 1,
+                        row[i] + 1,
+                        row[i - 1] + (word[i - 1] != char)
+                    ))
+                if min(next_row) <= max_edits:
+                    stack.append((child, text + char, next_row))
+        return matches
 
     def _calculate_relevance_score(self, query_words: List[str], doc_data: Dict[str, Any]) -> float:
         """Calculate relevance score for a document."""
-        title_lower = doc_data['title'].lower()
-        content_lower = doc_data['content'].lower()
+        doc_id = doc_data['id']
+        inverted = self._inverted
 
         score = 0.0
 
         for word in query_words:
-            # Title matches have higher weight
-            title_count = title_lower.count(word)
-            content_count = content_lower.count(word)
-
-            score += title_count * 3.0  # Title matches weighted 3x
-            score += content_count * 1.0  # Content matches weighted 1x
+            counts = inverted.get(word, {}).get(doc_id)
+            if counts:
+                # Title matches have higher weight
+                score += counts[0] * 3.0  # Title matches weighted 3x
+                score += counts[1] * 1.0  # Content matches weighted 1x
 
         # Normalize by document length
         if doc_data['word_count'] > 0:
@@ -566,16 +989,20 @@ class SearchService:
 
         return score
 
-    def _highlight_content(self, query_words: List[str], content: str, max_length: int = 200) -> str:
+    @staticmethod
+    def _highlight_pattern(query_words: List[str]) -> Optional[re.Pattern]:
+        """Compile one case-insensitive pattern matching any query word."""
+        if not query_words:
+            return None
+        # Longest first so a word wins over its own prefixes
+        words = sorted(set(query_words), key=len, reverse=True)
+        return re.compile("|".join(map(re.escape, words)), re.IGNORECASE)
+
+    def _highlight_content(self, pattern: Optional[re.Pattern], content: str, max_length: int = 200) -> str:
         """Highlight search terms in content snippet."""
         # Find the first occurrence of any query word
-        content_lower = content.lower()
-        first_pos = len(content)
-
-        for word in query_words:
-            pos = content_lower.find(word)
-            if pos != -1 and pos < first_pos:
-                first_pos = pos
+        match = pattern.search(content) if pattern else None
+        first_pos = match.start() if match else len(content)
 
         # Extract snippet around the first match
         start = max(0, first_pos - 50)
@@ -588,10 +1015,8 @@ class SearchService:
         if end < len(content):
             snippet = snippet + "..."
 
-        # Highlight query words (simple implementation)
-        for word in query_words:
-            snippet = snippet.replace(word, f"**{word}**")
-            snippet = snippet.replace(word.capitalize(), f"**{word.capitalize()}**")
+        if pattern:
+            snippet = pattern.sub(r"**\g<0>**", snippet)
 
         return snippet
 
@@ -627,48 +1052,30 @@ class NotificationService:
 
     def __init__(self, email_service: Optional[EmailService] = None):
         self.email_service = email_service
-        self.notification_queue: List[Notification] = []
+        # Min-heap of (scheduled_at, tiebreak, notification)
+        self._heap: List[Tuple[datetime, int, Notification]] = []
+        self._queue_counter = itertools.count()
         self.sent_notifications: List[Notification] = []
+        self._handlers: Dict[NotificationType, Callable[[Notification], Awaitable[None]]] = {
+            NotificationType.EMAIL: self._send_email,
+            NotificationType.SMS: self._send_sms,
+            NotificationType.PUSH: self._send_push,
+        }
+
+    @property
+    def notification_queue(self) -> Tuple[Notification, ...]:
+        """Scheduled notifications in the order they fall due (read-only)."""
+        return tuple(entry[2] for entry in sorted(self._heap))
 
     async def send_notification(self, notification: Notification) -> bool:
         """Send a notification immediately."""
         try:
-            if notification.type == NotificationType.EMAIL:
-                if not self.email_service:
-                    raise NotificationServiceError("Email service not configured")
-
-                email_message = EmailMessage(
-                    to=notification.recipient,
-                    subject=notification.title,
-                    body=notification.message,
-                    template_data=notification.data
-                )
-
-                success = await self.email_service.send_email(email_message)
-
-                if success:
-                    notification.status = "sent"
-                    notification.sent_at = datetime.now()
-                else:
-                    notification.status = "failed"
-
-            elif notification.type == NotificationType.SMS:
-                # Simulate SMS sending
-                await asyncio.sleep(0.1)
-                notification.status = "sent"
-                notification.sent_at = datetime.now()
-                logger.info(f"SMS sent to {notification.recipient}: {notification.message}")
-
-            elif notification.type == NotificationType.PUSH:
-                # Simulate push notification
-                await asyncio.sleep(0.1)
-                notification.status = "sent"
-                notification.sent_at = datetime.now()
-                logger.info(f"Push notification sent to {notification.recipient}")
-
-            else:
+            handler = self._handlers.get(notification.type)
+            if handler is None:
                 raise NotificationServiceError(f"Unsupported notification type: {notification.type}")
 
+            await handler(notification)
+
             if notification.status == "sent":
                 self.sent_notifications.append(notification)
                 return True
@@ -678,43 +1085,94 @@ class NotificationService:
         except Exception as e:
             notification.status = "failed"
             notification.retry_count += 1
-            logger.error(f"Failed to send notification {notification.id}: {e}")
+            logger.error("Failed to send notification %s: %s", notification.id, e)
             return False
 
+    async def _send_email(self, notification: Notification):
+        """Deliver a notification through the email service."""
+        if not self.email_service:
+            raise NotificationServiceError("Email service not configured")
+
+        email_message = EmailMessage(
+            to=notification.recipient,
+            subject=notification.title,
+            body=notification.message,
+            template_data=notification.data
+        )
+
+        success = await self.email_service.send_email(email_message)
+
+        if success:
+            notification.status = "sent"
+            notification.sent_at = datetime.now()
+        else:
+            notification.status = "failed"
+
+    async def _send_sms(self, notification: Notification):
+        """Deliver a notification by SMS."""
+        # Simulate SMS sending
+        await asyncio.sleep(0.1)
+        notification.status = "sent"
+        notification.sent_at = datetime.now()
+        logger.info("SMS sent to %s: %s", notification.recipient, notification.message)
+
+    async def _send_push(self, notification: Notification):
+        """Deliver a push notification."""
+        # Simulate push notification
+        await asyncio.sleep(0.1)
+        notification.status = "sent"
+        notification.sent_at = datetime.now()
+        logger.info("Push notification sent to %s", notification.recipient)
+
+    def register_handler(
+        self,
+        notification_type: NotificationType,
+        handler: Callable[[Notification], Awaitable[None]]
+    ):
+        """Register a delivery handler for a notification type."""
+        self._handlers[notification_type] = handler
+
     def schedule_notification(self, notification: Notification):
         """Schedule a notification for later sending."""
         if not notification.scheduled_at:
             notification.scheduled_at = datetime.now() + timedelta(minutes=5)
 
         notification.status = "scheduled"
-        self.notification_queue.append(notification)
-        logger.info(f"Scheduled notification {notification.id} for {notification.scheduled_at}")
+        heapq.heappush(
+            self._heap,
+            (notification.scheduled_at, next(self._queue_counter), notification)
+        )
+        logger.info("Scheduled notification %s for %s", notification.id, notification.scheduled_at)
 
     async def process_scheduled_notifications(self):
         """Process notifications that are ready to be sent."""
         now = datetime.now()
-        ready_notifications = [
-            n for n in self.notification_queue
-            if n.scheduled_at and n.scheduled_at <= now and n.status == "scheduled"
-        ]
+        queue = self._heap
+
+        # Pop everything due first so retries pushed back cannot be re-popped
+        ready_notifications = []
+        while queue and queue[0][0] <= now:
+            ready_notifications.append(heapq.heappop(queue)[2])
 
         for notification in ready_notifications:
             success = await self.send_notification(notification)
 
-            if success or notification.retry_count >= notification.max_retries:
-                # Remove from queue if sent successfully or max retries reached
-                self.notification_queue.remove(notification)
-            else:
+            if not success and notification.retry_count < notification.max_retries:
                 # Reschedule for retry
                 notification.scheduled_at = now + timedelta(minutes=5 * (notification.retry_count + 1))
+                heapq.heappush(queue, (notification.scheduled_at, next(self._queue_counter), notification))
 
-        logger.info(f"Processed {len(ready_notifications)} scheduled notifications")
+        logger.info("Processed %s scheduled notifications", len(ready_notifications))
 
     def get_notification_stats(self) -> Dict[str, Any]:
         """Get notification statistics."""
         total_sent = len(self.sent_notifications)
-        queued = len([n for n in self.notification_queue if n.status == "scheduled"])
-        failed = len([n for n in self.notification_queue if n.status == "failed"])
+        queued = failed = 0
+        for _, _, notification in self._heap:
+            if notification.status == "scheduled":
+                queued += 1
+            elif notification.status == "failed":
+                failed += 1
 
         # Group by type
         type_stats = {}
@@ -734,7 +1192,21 @@ class AnalyticsService:
     """Service for collecting and analyzing user analytics."""
 
     def __init__(self):
-        self.events: List[AnalyticsEvent] = []
+        # Appended in timestamp order, so time windows can be bisected. The
+        # service owns this list; events leave it only through purge_events()
+        # or clear_events(), which keep the indexes below in step.
+        self._events: List[AnalyticsEvent] = []
+        self._events_by_user: DefaultDict[Optional[str], List[AnalyticsEvent]] = defaultdict(list)
+        # Columnar copies of the aggregated fields, aligned with _events
+        self._timestamps_ns = array('q')
+        self._event_names: List[str] = []
+        self._page_view_timestamps_ns = array('q')
+        self._page_view_pages: List[str] = []
+
+    @property
+    def events(self) -> Tuple[AnalyticsEvent, ...]:
+        """Tracked events, oldest first, as a read-only snapshot."""
+        return tuple(self._events)
 
     def track_event(
         self,
@@ -746,51 +1218,84 @@ class AnalyticsService:
         user_agent: Optional[str] = None
     ):
         """Track an analytics event."""
+        timestamp_ns = time.time_ns()
+        timestamps = self._timestamps_ns
+        if timestamps and timestamp_ns < timestamps[-1]:
+            # The wall clock stepped back; keep the event order bisectable
+            timestamp_ns = timestamps[-1]
         event = AnalyticsEvent(
             event_name=event_name,
             user_id=user_id,
             session_id=session_id,
             properties=properties or {},
+            timestamp_ns=timestamp_ns,
             ip_address=ip_address,
             user_agent=user_agent
         )
 
-        self.events.append(event)
-        logger.debug(f"Tracked event: {event_name} for user {user_id}")
+        self._events.append(event)
+        self._events_by_user[user_id].append(event)
+        timestamps.append(timestamp_ns)
+        self._event_names.append(event_name)
+        if event_name == "page_view":
+            self._page_view_timestamps_ns.append(timestamp_ns)
+            self._page_view_pages.append(event.properties.get('page', 'unknown'))
+        logger.debug("Tracked event: %s for user %s", event_name, user_id)
+
+    def purge_events(self, older_than_days: int) -> int:
+        """Drop events older than N days and return how many were removed."""
+        cutoff_ns = time.time_ns() - older_than_days * _NS_PER_DAY
+        removed = bisect.bisect_left(self._timestamps_ns, cutoff_ns)
+        if not removed:
+            return 0
+        del self._events[:removed]
+        del self._timestamps_ns[:removed]
+        del self._event_names[:removed]
+        page_views = bisect.bisect_left(self._page_view_timestamps_ns, cutoff_ns)
+        del self._page_view_timestamps_ns[:page_views]
+        del self._page_view_pages[:page_views]
+
+        events_by_user = self._events_by_user
+        for user_id, user_events in list(events_by_user.items()):
+            start = bisect.bisect_left(user_events, cutoff_ns, key=_EVENT_TIMESTAMP_NS)
+            if start == len(user_events):
+                del events_by_user[user_id]
+            elif start:
+                del user_events[:start]
+        return removed
+
+    def clear_events(self) -> None:
+        """Drop all tracked events."""
+        self._events.clear()
+        self._events_by_user.clear()
+        del self._timestamps_ns[:]
+        self._event_names.clear()
+        del self._page_view_timestamps_ns[:]
+        self._page_view_pages.clear()
+
+    @staticmethod
+    def _since(events: List[AnalyticsEvent], days: int) -> List[AnalyticsEvent]:
+        """Return the tail of a timestamp-ordered event list within N days."""
+        cutoff_ns = time.time_ns() - days * _NS_PER_DAY
+        return events[bisect.bisect_left(events, cutoff_ns, key=_EVENT_TIMESTAMP_NS):]
 
     def get_event_counts(self, days: int = 30) -> Dict[str, int]:
         """Get event counts for the past N days."""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        recent_events = [e for e in self.events if e.timestamp >= cutoff_date]
-
-        event_counts = {}
-        for event in recent_events:
-            event_counts[event.event_name] = event_counts.get(event.event_name, 0) + 1
-
-        return event_counts
+        cutoff_ns = time.time_ns() - days * _NS_PER_DAY
+        return Counter(self._event_names[bisect.bisect_left(self._timestamps_ns, cutoff_ns):])
 
     def get_user_activity(self, user_id: str, days: int = 30) -> List[AnalyticsEvent]:
         """Get activity for a specific user."""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        return [
-            e for e in self.events
-            if e.user_id == user_id and e.timestamp >= cutoff_date
-        ]
+        user_events = self._events_by_user.get(user_id)
+        if not user_events:
+            return []
+        return self._since(user_events, days)
 
     def get_popular_pages(self, days: int = 30) -> List[Tuple[str, int]]:
         """Get most popular pages based on page_view events."""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        page_views = [
-            e for e in self.events
-            if e.event_name == "page_view" and e.timestamp >= cutoff_date
-        ]
-
-        page_counts = {}
-        for event in page_views:
-            page = event.properties.get('page', 'unknown')
-            page_counts[page] = page_counts.get(page, 0) + 1
-
-        return sorted(page_counts.items(), key=lambda x: x[1], reverse=True)
+        cutoff_ns = time.time_ns() - days * _NS_PER_DAY
+        start = bisect.bisect_left(self._page_view_timestamps_ns, cutoff_ns)
+        return Counter(self._page_view_pages[start:]).most_common()
 
 
 # Example usage and service factory
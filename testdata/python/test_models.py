@@ -0,0 +1,168 @@
+"""Tests for the data models module."""
+
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from models import BaseModel, Field, Order, OrderItem, User, UserProfile
+
+
+def make_item(**kwargs):
+    fields = {'order_id': 1, 'product_id': 2, 'quantity': 1, 'unit_price': Decimal('9.99')}
+    fields.update(kwargs)
+    return OrderItem(**fields)
+
+
+def test_identical_product_snapshots_are_shared_read_only_copies():
+    snapshot = {'name': 'Widget', 'price': '9.99'}
+    first = make_item(product_snapshot=snapshot)
+    second = make_item(product_snapshot=dict(snapshot))
+
+    assert first.product_snapshot is second.product_snapshot
+    assert first.product_snapshot is not snapshot
+    snapshot['name'] = 'Changed'
+    assert first.product_snapshot['name'] == 'Widget'
+    with pytest.raises(TypeError):
+        first.product_snapshot['name'] = 'Changed'
+
+
+def test_unhashable_snapshots_get_a_private_read_only_copy():
+    snapshot = {'tags': ['a', 'b']}
+    item = make_item(product_snapshot=snapshot)
+    assert item.product_snapshot == snapshot
+    assert item.product_snapshot is not snapshot
+    with pytest.raises(TypeError):
+        item.product_snapshot['tags'] = []
+
+
+def test_to_dict_returns_a_plain_snapshot_dict():
+    item = make_item(product_snapshot={'name': 'Widget'})
+    data = item.to_dict()
+    assert type(data['product_snapshot']) is dict
+    data['product_snapshot']['name'] = 'Changed'
+    assert item.product_snapshot['name'] == 'Widget'
+    assert json.loads(json.dumps(data, default=str))['product_snapshot'] == {'name': 'Changed'}
+
+
+def make_order():
+    return Order(id=1, order_number='ORD-1', user_id=1,
+                 subtotal=Decimal('0'), total_amount=Decimal('0'))
+
+
+def test_order_subtotal_keeps_sub_cent_precision():
+    order = make_order()
+    order.add_item(product_id=1, quantity=3, unit_price=Decimal('0.333'))
+    assert order.subtotal == Decimal('0.999')
+    order.add_item(product_id=2, quantity=2, unit_price=Decimal('10.00'))
+    assert order.subtotal == Decimal('20.999')
+    assert order.total_amount == Decimal('20.999')
+
+
+def test_assigned_line_total_feeds_the_next_recalculation():
+    order = make_order()
+    item = order.add_item(product_id=1, quantity=1, unit_price=Decimal('5.00'))
+    item.line_total = Decimal('100.00')
+    order._recalculate_totals()
+    assert order.subtotal == Decimal('100.00')
+    item.update_quantity(3)
+    order._recalculate_totals()
+    assert item.line_total == Decimal('15.00')
+    assert order.subtotal == Decimal('15.00')
+
+
+def test_money_fields_are_declared_fields():
+    item = make_item(quantity=2)
+    assert {'unit_price', 'line_total'} <= set(OrderItem._fields)
+    assert item.to_dict()['line_total'] == Decimal('19.98')
+    assert item.validate() == []
+    assert OrderItem.from_dict(item.to_dict()).to_dict() == item.to_dict()
+
+
+@pytest.mark.parametrize('amount', [
+    Decimal('Infinity'), Decimal('-Infinity'), Decimal('NaN'), Decimal('0.0000001'),
+])
+def test_money_fields_reject_non_finite_or_over_precise_amounts(amount):
+    with pytest.raises(ValueError, match='Invalid value for field unit_price'):
+        make_item(unit_price=amount, line_total=Decimal('1.00'))
+    item = make_item()
+    with pytest.raises(ValueError, match='Invalid value for field line_total'):
+        item.line_total = amount
+    assert item.line_total == Decimal('9.99')
+
+
+def test_money_fields_accept_trailing_zeros_beyond_the_allowed_places():
+    assert make_item(unit_price=Decimal('1.250000000')).unit_price == Decimal('1.25')
+
+
+def make_user(**kwargs):
+    fields = {'username': 'ann', 'email': 'ann@example.com', 'first_name': 'Ann',
+              'last_name': 'Lee', 'password_hash': 'hash'}
+    fields.update(kwargs)
+    return User(**fields)
+
+
+def test_generated_init_applies_defaults():
+    user = make_user()
+    assert user.id is None
+    assert user.is_admin is False
+    # Both timestamps come from one clock read
+    assert isinstance(user.created_at, datetime)
+    assert user.created_at is user.updated_at
+
+    first, second = UserProfile(user_id=1), UserProfile(user_id=2)
+    assert first.timezone == 'UTC'
+    assert first.preferences == {}
+    assert first.preferences is not second.preferences
+
+    stamp = datetime(2024, 1, 1)
+    assert make_user(updated_at=stamp).created_at is not stamp
+
+
+def test_generated_init_validates_fields():
+    with pytest.raises(ValueError, match='field email'):
+        make_user(email=None)
+    with pytest.raises(ValueError, match='field username'):
+        make_user(username='a' * 51)
+    with pytest.raises(ValueError, match='field is_admin'):
+        make_user(is_admin='yes')
+    assert UserProfile(user_id=1, bio=None).bio is None
+
+
+def test_generated_init_ignores_unknown_kwargs():
+    user = make_user(nickname='annie')
+    assert not hasattr(user, 'nickname')
+
+
+def test_models_store_fields_in_slots():
+    user = make_user()
+    assert not hasattr(user, '__dict__')
+    assert {'username', 'created_at', '_orders'} <= set(User.__slots__)
+    with pytest.raises(AttributeError):
+        user.nickname = 'annie'
+
+
+def test_subclass_fields_get_their_own_slots_and_init():
+    class Tagged(BaseModel):
+        label = Field(str, nullable=False, max_length=10)
+        tags = Field(list, default=list)
+        __extra_slots__ = ('_cache',)
+
+    class Pinned(Tagged):
+        pinned = Field(bool, default=False)
+
+    assert Tagged.__slots__ == ('label', 'tags', '_cache')
+    assert Pinned.__slots__ == ('pinned',)
+
+    tagged = Tagged(label='a')
+    assert tagged.tags == [] and tagged.tags is not Tagged(label='b').tags
+    tagged._cache = 1
+    with pytest.raises(ValueError, match='field label'):
+        Tagged()
+
+    pinned = Pinned(pinned=True)
+    assert pinned.pinned is True
+    assert not hasattr(pinned, '__dict__')
+    pinned.label = 'inherited slot'
+    assert pinned.label == 'inherited slot'
@@ -0,0 +1,387 @@
+"""Tests for the service layer module."""
+
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+import services
+from services import (
+    AnalyticsService,
+    EmailConfig,
+    EmailService,
+    EmailServiceError,
+    EmailTemplate,
+    Notification,
+    NotificationService,
+    NotificationType,
+    PaymentConfig,
+    PaymentIntent,
+    PaymentService,
+    PaymentStatus,
+    SearchConfig,
+    SearchService,
+    _NS_PER_DAY,
+    _SMTP_POOL_SIZE,
+    _new_id,
+)
+
+
+@pytest.fixture
+def payment_service(monkeypatch):
+    async def no_delay(_seconds):
+        pass
+
+    monkeypatch.setattr(services.asyncio, "sleep", no_delay)
+    return PaymentService(PaymentConfig("key", "secret", "webhook"))
+
+
+def test_new_id_is_unique_and_time_ordered():
+    ids = [_new_id() for _ in range(1000)]
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+    assert all(len(value) == 32 for value in ids)
+    int(ids[0], 16)
+
+
+def test_new_id_stays_ordered_when_clock_stalls_or_steps_back(monkeypatch):
+    readings = iter([2_000_000_000_000_000_000] * 3 + [1_000_000_000_000_000_000] * 3)
+    monkeypatch.setattr(services.time, "time_ns", lambda: next(readings))
+    ids = [_new_id() for _ in range(6)]
+    assert ids == sorted(ids)
+    assert len({value[:16] for value in ids}) == len(ids)
+
+
+def test_dataclasses_get_generated_ids():
+    notification = Notification(type=NotificationType.EMAIL, recipient="a@b.c",
+                                title="t", message="m")
+    intent = PaymentIntent(amount=500)
+    assert len(notification.id) == 32
+    assert len(intent.id) == 32
+    assert intent.amount == 500
+    assert intent.status == PaymentStatus.PENDING
+
+
+def test_payment_intent_amount_is_required():
+    with pytest.raises(TypeError):
+        PaymentIntent()
+
+
+def test_payment_and_refund_flow(payment_service):
+    async def flow():
+        intent = await payment_service.create_payment_intent(500, customer_id="c1")
+        await payment_service.process_payment(intent, "card")
+        refund = await payment_service.refund_payment(intent.id)
+        return intent, refund
+
+    intent, refund = asyncio.run(flow())
+    assert intent.status == PaymentStatus.REFUNDED
+    assert refund["payment_id"] == intent.id
+    assert refund["amount"] == 500
+    assert len(refund["id"]) == 32
+    assert payment_service.get_payment_history("c1") == [intent]
+
+
+class FakeSMTP:
+    """Stand-in for aiosmtplib.SMTP; send_message blocks until released."""
+
+    def __init__(self):
+        self.is_connected = True
+        self.quit_called = False
+        self.release = asyncio.Event()
+
+    async def send_message(self, message):
+        await self.release.wait()
+        if not self.is_connected:
+            raise ConnectionError("closed")
+
+    def close(self):
+        self.is_connected = False
+
+    async def quit(self):
+        self.quit_called = True
+        self.is_connected = False
+
+
+@pytest.fixture
+def smtp_service(monkeypatch):
+    monkeypatch.setattr(services, "AIOSMTPLIB_AVAILABLE", True)
+    service = EmailService(EmailConfig("smtp.test", 587, "user", "pass"))
+    connections = []
+
+    async def connect():
+        smtp = FakeSMTP()
+        connections.append(smtp)
+        return smtp
+
+    monkeypatch.setattr(service, "_connect_smtp", connect)
+    return service, connections
+
+
+def test_cancelled_sends_return_their_pool_slots(smtp_service):
+    service, connections = smtp_service
+
+    async def flow():
+        for _ in range(_SMTP_POOL_SIZE + 1):
+            task = asyncio.create_task(service._send_smtp("message"))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        # Every slot is free again, so a later send does not hang
+        task = asyncio.create_task(service._send_smtp("message"))
+        await asyncio.sleep(0)
+        connections[-1].release.set()
+        await asyncio.wait_for(task, 1)
+
+    asyncio.run(flow())
+    assert all(not smtp.is_connected for smtp in connections[:-1])
+
+
+def test_close_shuts_idle_and_in_use_connections(smtp_service):
+    service, connections = smtp_service
+
+    async def flow():
+        idle = asyncio.create_task(service._send_smtp("message"))
+        await asyncio.sleep(0)
+        connections[0].release.set()
+        await idle
+
+        busy = asyncio.create_task(service._send_smtp("message"))
+        await asyncio.sleep(0)
+        await service.close()
+        connections[-1].release.set()
+        with pytest.raises(ConnectionError):
+            await busy
+
+    asyncio.run(flow())
+    # The finished send left its connection idle; the other was mid-send
+    assert connections[0].quit_called
+    assert not connections[-1].quit_called
+    assert not connections[-1].is_connected
+    assert service._smtp_connections == set()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time_ns; advance by assigning to clock[0]."""
+    now = [1_700_000_000 * 10**9]
+    monkeypatch.setattr(services.time, "time_ns", lambda: now[0])
+    return now
+
+
+def test_analytics_purge_keeps_user_activity_in_step(clock):
+    analytics = AnalyticsService()
+    analytics.track_event("login", user_id="u1")
+    analytics.track_event("login", user_id="u2")
+    clock[0] += 40 * _NS_PER_DAY
+    analytics.track_event("page_view", user_id="u1", properties={"page": "/home"})
+
+    assert len(analytics.get_user_activity("u1", days=100)) == 2
+    assert analytics.purge_events(older_than_days=30) == 2
+    assert [e.event_name for e in analytics.events] == ["page_view"]
+    assert [e.event_name for e in analytics.get_user_activity("u1", days=100)] == ["page_view"]
+    assert analytics.get_user_activity("u2", days=100) == []
+    assert analytics.purge_events(older_than_days=30) == 0
+
+    analytics.clear_events()
+    assert analytics.events == ()
+    assert analytics.get_user_activity("u1", days=100) == []
+
+
+def test_analytics_events_cannot_be_trimmed_behind_the_indexes():
+    analytics = AnalyticsService()
+    analytics.track_event("login", user_id="u1")
+    with pytest.raises(TypeError):
+        del analytics.events[:1]
+    assert len(analytics.get_user_activity("u1")) == 1
+
+
+def test_analytics_keeps_events_ordered_when_clock_steps_back(clock):
+    analytics = AnalyticsService()
+    analytics.track_event("login", user_id="u1")
+    clock[0] -= _NS_PER_DAY
+    analytics.track_event("logout", user_id="u1")
+    timestamps = [e.timestamp_ns for e in analytics.events]
+    assert timestamps == sorted(timestamps)
+    assert len(analytics.get_user_activity("u1", days=1)) == 2
+
+
+def test_analytics_column_aggregates_follow_windows_and_purges(clock):
+    analytics = AnalyticsService()
+    analytics.track_event("page_view", user_id="u1", properties={"page": "/old"})
+    analytics.track_event("login", user_id="u1")
+    clock[0] += 40 * _NS_PER_DAY
+    for page in ("/home", "/cart", "/home"):
+        analytics.track_event("page_view", user_id="u2", properties={"page": page})
+    analytics.track_event("page_view", user_id="u2")
+
+    assert analytics.get_event_counts() == {"page_view": 4}
+    assert analytics.get_event_counts(100) == {"page_view": 5, "login": 1}
+    assert analytics.get_popular_pages() == [("/home", 2), ("/cart", 1), ("unknown", 1)]
+    assert analytics.get_popular_pages(100) == [
+        ("/home", 2), ("/old", 1), ("/cart", 1), ("unknown", 1)
+    ]
+
+    analytics.purge_events(older_than_days=30)
+    assert analytics.get_event_counts(100) == {"page_view": 4}
+    assert ("/old", 1) not in analytics.get_popular_pages(100)
+
+    analytics.clear_events()
+    assert analytics.get_event_counts(100) == {}
+    assert analytics.get_popular_pages(100) == []
+
+
+@pytest.mark.parametrize("source, data", [
+    ("Hi {name!r:>8}, total {total:.2f}", {"name": "Ann", "total": 3.5}),
+    ("{user.name} owes {amounts[0]}", {"user": SimpleNamespace(name="Ann"), "amounts": [7]}),
+    ("{value:{width}}|", {"value": 5, "width": 4}),
+])
+def test_render_template_matches_str_format(source, data):
+    service = EmailService(EmailConfig("smtp.test", 587, "user", "pass"))
+    service.template_cache[EmailTemplate.NEWSLETTER] = source
+    assert service._render_template(EmailTemplate.NEWSLETTER, data) == source.format(**data)
+
+
+def test_render_template_uses_replaced_source_and_reports_missing_fields():
+    service = EmailService(EmailConfig("smtp.test", 587, "user", "pass"))
+    service.template_cache[EmailTemplate.NEWSLETTER] = "Hello {name}"
+    assert service._render_template(EmailTemplate.NEWSLETTER, {"name": "Ann"}) == "Hello Ann"
+    service.template_cache[EmailTemplate.NEWSLETTER] = "Bye {name}"
+    assert service._render_template(EmailTemplate.NEWSLETTER, {"name": "Ann"}) == "Bye Ann"
+    with pytest.raises(EmailServiceError, match="Missing template variable"):
+        service._render_template(EmailTemplate.NEWSLETTER, {})
+
+
+def test_template_sources_are_per_instance():
+    config = EmailConfig("smtp.test", 587, "user", "pass")
+    first, second = EmailService(config), EmailService(config)
+    first.template_cache[EmailTemplate.WELCOME] = "Hi {name}"
+    del first.template_cache[EmailTemplate.ORDER_CONFIRMATION]
+
+    data = {"name": "Ann", "username": "ann"}
+    assert first._render_template(EmailTemplate.WELCOME, data) == "Hi Ann"
+    assert "Welcome Ann!" in second._render_template(EmailTemplate.WELCOME, data)
+    assert EmailTemplate.ORDER_CONFIRMATION in second.template_cache
+    assert EmailService._TEMPLATE_SOURCES[EmailTemplate.WELCOME] != "Hi {name}"
+
+
+def test_notification_queue_lists_notifications_in_due_order(monkeypatch):
+    async def no_delay(_seconds):
+        pass
+
+    monkeypatch.setattr(services.asyncio, "sleep", no_delay)
+    service = NotificationService()
+    now = datetime.now()
+    later = Notification(type=NotificationType.PUSH, recipient="later",
+                         scheduled_at=now + timedelta(hours=1))
+    due = Notification(type=NotificationType.SMS, recipient="due",
+                       scheduled_at=now - timedelta(minutes=1))
+    # No email service is configured, so this one fails and is retried
+    retried = Notification(type=NotificationType.EMAIL, recipient="retried",
+                           scheduled_at=now - timedelta(minutes=2))
+    for notification in (later, due, retried):
+        service.schedule_notification(notification)
+
+    assert service.notification_queue == (retried, due, later)
+    with pytest.raises(AttributeError):
+        service.notification_queue.append(due)
+
+    asyncio.run(service.process_scheduled_notifications())
+    assert service.notification_queue == (retried, later)
+    assert all(isinstance(n, Notification) for n in service.notification_queue)
+    assert service.get_notification_stats()["failed"] == 1
+
+
+def run_search(service, query, **kwargs):
+    results, total = asyncio.run(service.search(query, **kwargs))
+    return [result.id for result in results], total
+
+
+def test_search_matches_whole_tokens_only():
+    service = SearchService(SearchConfig(index_path="unused"))
+    service.index_document("cat", "Cat care", "feeding a cat")
+    service.index_document("catalog", "Catalog", "spring catalog")
+    service.index_document("concat", "Strings", "concat two strings")
+
+    assert run_search(service, "cat") == (["cat"], 1)
+    assert run_search(service, "CAT, catalog!")[1] == 2
+    assert run_search(service, "at") == ([], 0)
+
+
+def test_search_orders_equal_scores_by_index_order():
+    service = SearchService(SearchConfig(index_path="unused"))
+    for doc_id in ("b", "c", "a", "d"):
+        service.index_document(doc_id, "Guide", "python tips")
+    service.index_document("top", "Python", "python tips")
+
+    assert run_search(service, "python") == (["top", "b", "c", "a", "d"], 5)
+    assert run_search(service, "python", limit=2, offset=1) == (["b", "c"], 5)
+
+    # Re-indexing keeps a document's place; removing and re-adding does not
+    service.index_document("b", "Guide", "python tips")
+    service.remove_document("c")
+    service.index_document("c", "Guide", "python tips")
+    assert run_search(service, "python")[0] == ["top", "b", "a", "d", "c"]
+
+
+@pytest.fixture
+def search_service():
+    service = SearchService(SearchConfig(index_path="unused"))
+    service.index_document("py", "Python", "python tips")
+    service.index_document("pyd", "Pydantic", "pydantic models")
+    service.index_document("cy", "Cython", "cython builds")
+    service.index_document("typ", "Typing", "typing hints")
+    return service
+
+
+def test_expand_query_serves_prefix_and_substring_terms(search_service):
+    assert sorted(search_service._expand_query("py*")) == ["pydantic", "python"]
+    assert sorted(search_service._expand_query("*thon")) == ["cython", "python"]
+    assert sorted(search_service._expand_query("*ypi*")) == ["typing"]
+    # Leading wildcards on terms under three characters fall back to prefix
+    assert sorted(search_service._expand_query("*py")) == ["pydantic", "python"]
+    assert search_service._expand_query("python zzz*") == ["python"]
+
+    assert sorted(run_search(search_service, "*thon")[0]) == ["cy", "py"]
+
+
+def test_expand_query_forgets_removed_tokens(search_service):
+    search_service.remove_document("pyd")
+    assert search_service._expand_query("py*") == ["python"]
+    assert search_service._expand_query("*anti*") == []
+    search_service.remove_document("py")
+    assert search_service._expand_query("py*") == []
+    assert sorted(search_service._expand_query("*thon")) == ["cython"]
+
+
+def run_fuzzy(service, query, **kwargs):
+    results, total = asyncio.run(service.fuzzy_search(query, **kwargs))
+    return sorted(result.id for result in results), total
+
+
+def test_tokens_within_finds_exact_and_single_edit_matches(search_service):
+    assert search_service._tokens_within("python", 1) == {"python": 0, "cython": 1}
+    # Deletion, insertion and a first-character substitution
+    assert search_service._tokens_within("pyton", 1) == {"python": 1}
+    assert search_service._tokens_within("pythonn", 1) == {"python": 1}
+    assert search_service._tokens_within("xython", 1) == {"python": 1, "cython": 1}
+    assert search_service._tokens_within("pyhton", 1) == {}
+    assert search_service._tokens_within("pyhton", 2) == {"python": 2}
+
+
+def test_fuzzy_search_applies_threshold_and_type_filter(search_service):
+    assert run_fuzzy(search_service, "pyton") == (["py"], 1)
+    assert run_fuzzy(search_service, "xython") == (["cy", "py"], 2)
+    # One edit in a four-letter word is below the default 0.8 similarity
+    assert run_fuzzy(search_service, "tips") == (["py"], 1)
+    assert run_fuzzy(search_service, "tipz") == ([], 0)
+    assert run_fuzzy(search_service, "pyhton", max_edits=2) == ([], 0)
+
+    search_service.config.fuzzy_threshold = 0.5
+    assert run_fuzzy(search_service, "tipz") == (["py"], 1)
+    assert run_fuzzy(search_service, "pyhton", max_edits=2) == (["py"], 1)
+
+    search_service.index_document("post", "Python", "python post", doc_type="blog")
+    assert run_fuzzy(search_service, "pyton", doc_type="blog") == (["post"], 1)
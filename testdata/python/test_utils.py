@@ -0,0 +1,26 @@
+"""Tests for the utility module."""
+
+import pytest
+
+from utils import ValidationUtils
+
+
+@pytest.mark.parametrize("card_number, expected", [
+    ("4111111111111111", (True, "Visa")),
+    ("4111 1111 1111 1111", (True, "Visa")),
+    ("4111-1111-1111-1111", (True, "Visa")),
+    ("5500000000000004", (True, "MasterCard")),
+    ("4111111111111112", (False, None)),
+    ("", (False, None)),
+])
+def test_validate_credit_card(card_number, expected):
+    assert ValidationUtils.validate_credit_card(card_number) == expected
+
+
+@pytest.mark.parametrize("card_number", [
+    "４１１１１１１１１１１１１１１１",  # fullwidth digits
+    "٤١١١١١١١١١١١١١١١",  # Arabic-Indic digits
+    "4111１111111111111",  # ASCII mixed with a fullwidth digit
+])
+def test_validate_credit_card_rejects_non_ascii_digits(card_number):
+    assert ValidationUtils.validate_credit_card(card_number) == (False, None)
@@ -18,17 +18,20 @@ import json
 import os
 import re
 import secrets
+import statistics
 import time
 import uuid
-from collections import Counter, defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal, InvalidOperation
 from functools import wraps, lru_cache
+from itertools import chain
+from operator import itemgetter
 from pathlib import Path
 from typing import (
     Any, Callable, Dict, List, Optional, Union, Tuple, Set,
-    Generator, Iterator, TypeVar, Generic, Protocol
+    Generator, Iterable, Iterator, TypeVar, Generic, Protocol
 )
 from urllib.parse import urlparse, parse_qs
 
@@ -38,6 +41,97 @@ T = TypeVar('T')
 K = TypeVar('K')
 V = TypeVar('V')
 
+# Hours from UTC by upper-case abbreviation, for get_timezone_offset
+TIMEZONE_OFFSETS: Dict[str, int] = {
+    'UTC': 0,
+    'EST': -5,
+    'CST': -6,
+    'MST': -7,
+    'PST': -8,
+    'GMT': 0,
+    'CET': 1,
+    'JST': 9
+}
+
+# Precompiled patterns shared by the utility classes below
+_SLUG_NONWORD_RE = re.compile(r'[^\w\s-]')
+_SLUG_DASH_RE = re.compile(r'[-\s]+')
+_EMAIL_LOCAL_RE = re.compile(r'[a-zA-Z0-9._%+-]+')
+_EMAIL_HOST_RE = re.compile(r'[a-zA-Z0-9.-]+')
+_URL_RE = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+_NONDIGIT_RE = re.compile(r'\D')
+_CARD_CLEAN_RE = re.compile(r'[\s-]')
+# Digit sum of 2*d for each digit d, used by the Luhn check
+_LUHN_DOUBLED = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+_CARD_TYPES_BY_PREFIX = {
+    '4': 'Visa',
+    '51': 'MasterCard', '52': 'MasterCard', '53': 'MasterCard', '54': 'MasterCard', '55': 'MasterCard',
+    '34': 'American Express', '37': 'American Express',
+    '6011': 'Discover',
+}
+
+_PASSWORD_LOWERCASE = "abcdefghijklmnopqrstuvwxyz"
+_PASSWORD_UPPERCASE = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_PASSWORD_DIGITS = "0123456789"
+_PASSWORD_SYMBOL_CHARS = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+_PASSWORD_SYMBOLS = frozenset('!@#$%^&*(),.?":{}|<>')
+_SEQUENTIAL_NUMBERS = frozenset('0123456789'[i:i + 3] for i in range(8))
+_SEQUENTIAL_LETTERS = frozenset('abcdefghijklmnopqrstuvwxyz'[i:i + 3] for i in range(24))
+# Zero-padded ISO layouts that datetime.fromisoformat parses identically
+_ISO_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}', re.ASCII)
+_ISO_DATETIME_RE = re.compile(r'\d{4}-\d{2}-\d{2}[Tt]\d{2}:\d{2}:\d{2}', re.ASCII)
+# PBKDF2 work factor for CryptoUtils.hash_password
+_PASSWORD_HASH_ITERATIONS = 100_000
+
+_FILE_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+# Read size for hashing files on Pythons without hashlib.file_digest
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# _EXTRA_BUSINESS_DAYS[weekday][n]: business days among n consecutive days
+# starting on weekday (Monday = 0, Friday = 4)
+_EXTRA_BUSINESS_DAYS = tuple(
+    tuple(sum((weekday + i) % 7 < 5 for i in range(n)) for n in range(7))
+    for weekday in range(7)
+)
+
+_SLASH_DATE_FORMATS = ('%d/%m/%Y', '%m/%d/%Y')
+_ISO_UTC_DATETIME_FORMATS = ('%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%dT%H:%M:%S.%fZ')
+_ISO_DATETIME_FORMATS = ('%Y-%m-%dT%H:%M:%S',)
+_SPACED_DATETIME_FORMATS = ('%Y-%m-%d %H:%M:%S',)
+_ISO_DATE_FORMATS = ('%Y-%m-%d',)
+_DASHED_DATE_FORMATS = ('%d-%m-%Y', '%m-%d-%Y')
+
+_SAFE_FILENAME_RE = re.compile(r'[<>:"/\\|?*]')
+
+
+def _make_cache_key(args: tuple, kwargs: Dict[str, Any]) -> Any:
+    """Build a hashable cache key, falling back to repr for unhashable args.
+
+    Argument types are part of the key, as with ``lru_cache(typed=True)``, so
+    equal values of different types such as 1, 1.0 and True stay distinct.
+    """
+    if kwargs:
+        items = tuple(sorted(kwargs.items()))
+        key = (args, items, tuple(type(a) for a in args),
+               tuple(type(v) for _, v in items))
+    else:
+        key = (args, tuple(type(a) for a in args))
+    try:
+        hash(key)
+    except TypeError:
+        return repr(key)
+    return key
+
+
+def _xor_with_key(data: bytes, key: bytes) -> bytes:
+    """XOR data with a repeating key as one big-integer operation."""
+    size = len(data)
+    if not size:
+        return b''
+    key_stream = (key * (size // len(key) + 1))[:size]
+    return (int.from_bytes(data, 'big') ^ int.from_bytes(key_stream, 'big')).to_bytes(size, 'big')
+
 
 class StringUtils:
     """Collection of string manipulation utilities."""
@@ -45,8 +139,8 @@ class StringUtils:
     @staticmethod
     def slugify(text: str, max_length: int = 50) -> str:
         """Convert text to URL-friendly slug."""
-        slug = re.sub(r'[^\w\s-]', '', text.lower())
-        slug = re.sub(r'[-\s]+', '-', slug).strip('-')
+        slug = _SLUG_NONWORD_RE.sub('', text.lower())
+        slug = _SLUG_DASH_RE.sub('-', slug).strip('-')
         return slug[:max_length]
 
     @staticmethod
@@ -59,8 +153,19 @@ class StringUtils:
     @staticmethod
     def camel_to_snake(text: str) -> str:
         """Convert camelCase to snake_case."""
-        s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', text)
-        return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
+        # An ASCII capital starts a new word after a lowercase letter or
+        # digit, or when it begins a capitalized word ("HTTPServer")
+        chars = []
+        previous = ''
+        for i, char in enumerate(text):
+            if 'A' <= char <= 'Z' and i and (
+                'a' <= previous <= 'z' or '0' <= previous <= '9'
+                or (previous != '\n' and 'a' <= text[i + 1:i + 2] <= 'z')
+            ):
+                chars.append('_')
+            chars.append(char)
+            previous = char
+        return ''.join(chars).lower()
 
     @staticmethod
     def snake_to_camel(text: str) -> str:
@@ -71,8 +176,16 @@ class StringUtils:
     @staticmethod
     def is_valid_email(email: str) -> bool:
         """Validate email address format."""
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email))
+        # Split on the last '@' and '.' so each part is a flat character class
+        local, at, domain = email.rpartition('@')
+        if not at:
+            return False
+        host, dot, tld = domain.rpartition('.')
+        return bool(
+            dot and len(tld) >= 2 and tld.isascii() and tld.isalpha()
+            and _EMAIL_LOCAL_RE.fullmatch(local)
+            and _EMAIL_HOST_RE.fullmatch(host)
+        )
 
     @staticmethod
     def extract_domain(email: str) -> Optional[str]:
@@ -87,16 +200,12 @@ class StringUtils:
         if len(text) <= visible_chars * 2:
             return mask_char * len(text)
 
-        visible_start = text[:visible_chars]
-        visible_end = text[-visible_chars:]
-        masked_middle = mask_char * (len(text) - visible_chars * 2)
-        return visible_start + masked_middle + visible_end
+        return f"{text[:visible_chars]}{mask_char * (len(text) - visible_chars * 2)}{text[-visible_chars:]}"
 
     @staticmethod
     def extract_urls(text: str) -> List[str]:
         """Extract URLs from text."""
-        url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-        return re.findall(url_pattern, text)
+        return _URL_RE.findall(text)
 
     @staticmethod
     def generate_password(
@@ -107,20 +216,30 @@ class StringUtils:
         use_symbols: bool = True
     ) -> str:
         """Generate a secure random password."""
-        chars = ""
-        if use_lowercase:
-            chars += "abcdefghijklmnopqrstuvwxyz"
-        if use_uppercase:
-            chars += "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-        if use_digits:
-            chars += "0123456789"
-        if use_symbols:
-            chars += "!@#$%^&*()_+-=[]{}|;:,.<>?"
+        chars = ''.join(
+            charset for enabled, charset in (
+                (use_lowercase, _PASSWORD_LOWERCASE),
+                (use_uppercase, _PASSWORD_UPPERCASE),
+                (use_digits, _PASSWORD_DIGITS),
+                (use_symbols, _PASSWORD_SYMBOL_CHARS),
+            ) if enabled
+        )
 
         if not chars:
             raise ValueError("At least one character type must be enabled")
 
-        return ''.join(secrets.choice(chars) for _ in range(length))
+        # Draw random bytes in bulk; rejecting bytes >= limit keeps
+        # byte % len(chars) uniform
+        size = len(chars)
+        limit = 256 - 256 % size
+        password = []
+        while len(password) < length:
+            for byte in secrets.token_bytes(2 * (length - len(password))):
+                if byte < limit:
+                    password.append(chars[byte % size])
+                    if len(password) == length:
+                        break
+        return ''.join(password)
 
 
 class ValidationUtils:
@@ -138,7 +257,7 @@ class ValidationUtils:
     @staticmethod
     def is_valid_phone(phone: str, country_code: str = "US") -> bool:
         """Basic phone number validation (simplified)."""
-        digits_only = re.sub(r'\D', '', phone)
+        digits_only = _NONDIGIT_RE.sub('', phone)
 
         if country_code == "US":
             return len(digits_only) == 10 or (len(digits_only) == 11 and digits_only[0] == '1')
@@ -149,50 +268,61 @@ class ValidationUtils:
     @staticmethod
     def validate_credit_card(card_number: str) -> Tuple[bool, Optional[str]]:
         """Validate credit card using Luhn algorithm and detect card type."""
-        card_number = re.sub(r'[\s-]', '', card_number)
+        card_number = _CARD_CLEAN_RE.sub('', card_number)
 
-        if not card_number.isdigit():
+        if not (card_number.isascii() and card_number.isdigit()):
             return False, None
 
-        # Luhn algorithm
-        def luhn_checksum(card_num):
-            def digits_of(number):
-                return [int(d) for d in str(number)]
+        # Luhn algorithm: every second digit from the right is doubled
+        checksum = 0
+        for position, char in enumerate(reversed(card_number)):
+            digit = ord(char) - 48
+            checksum += _LUHN_DOUBLED[digit] if position & 1 else digit
 
-            digits = digits_of(card_num)
-            odd_digits = digits[-1::-2]
-            even_digits = digits[-2::-2]
-            checksum = sum(odd_digits)
-            for digit in even_digits:
-                checksum += sum(digits_of(digit * 2))
-            return checksum % 10
-
-        is_valid = luhn_checksum(card_number) == 0
+        if checksum % 10:
+            return False, None
 
         # Detect card type
-        card_type = None
-        if is_valid:
-            if card_number.startswith('4'):
-                card_type = 'Visa'
-            elif card_number.startswith(('51', '52', '53', '54', '55')):
-                card_type = 'MasterCard'
-            elif card_number.startswith(('34', '37')):
-                card_type = 'American Express'
-            elif card_number.startswith('6011'):
-                card_type = 'Discover'
-
-        return is_valid, card_type
+        prefixes = _CARD_TYPES_BY_PREFIX
+        card_type = (
+            prefixes.get(card_number[:1])
+            or prefixes.get(card_number[:2])
+            or prefixes.get(card_number[:4])
+        )
+        return True, card_type
 
     @staticmethod
     def validate_password_strength(password: str) -> Dict[str, Any]:
         """Analyze password strength and return feedback."""
+        # Classify every character and track repeat runs in a single pass
+        has_upper = has_lower = has_digit = has_symbol = has_repeat = False
+        previous = None
+        run_length = 0
+        for char in password:
+            if 'A' <= char <= 'Z':
+                has_upper = True
+            elif 'a' <= char <= 'z':
+                has_lower = True
+            elif char.isdecimal():
+                has_digit = True
+            elif char in _PASSWORD_SYMBOLS:
+                has_symbol = True
+
+            if char == previous:
+                run_length += 1
+                if run_length >= 3 and char != '\n':
+                    has_repeat = True
+            else:
+                previous = char
+                run_length = 1
+
         feedback = {
             'score': 0,
             'length': len(password),
-            'has_uppercase': bool(re.search(r'[A-Z]', password)),
-            'has_lowercase': bool(re.search(r'[a-z]', password)),
-            'has_digits': bool(re.search(r'\d', password)),
-            'has_symbols': bool(re.search(r'[!@#$%^&*(),.?":{}|<>]', password)),
+            'has_uppercase': has_upper,
+            'has_lowercase': has_lower,
+            'has_digits': has_digit,
+            'has_symbols': has_symbol,
             'common_patterns': [],
             'suggestions': []
         }
@@ -212,11 +342,13 @@ class ValidationUtils:
             feedback['score'] += 1
 
         # Check for common patterns
-        if re.search(r'(.)\1{2,}', password):  # Repeated characters
+        if has_repeat:  # Repeated characters
             feedback['common_patterns'].append('repeated_characters')
-        if re.search(r'(012|123|234|345|456|567|678|789)', password):
+        lowered = password.lower()
+        trigrams = {lowered[i:i + 3] for i in range(len(lowered) - 2)}
+        if not trigrams.isdisjoint(_SEQUENTIAL_NUMBERS):
             feedback['common_patterns'].append('sequential_numbers')
-        if re.search(r'(abc|bcd|cde|def|efg|fgh|ghi|hij|ijk|jkl|klm|lmn|mno|nop|opq|pqr|qrs|rst|stu|tuv|uvw|vwx|wxy|xyz)', password.lower()):
+        if not trigrams.isdisjoint(_SEQUENTIAL_LETTERS):
             feedback['common_patterns'].append('sequential_letters')
 
         # Generate suggestions
@@ -244,67 +376,114 @@ class CacheUtils:
 
         @wraps(func)
         def wrapper(*args, **kwargs):
-            key = str(args) + str(sorted(kwargs.items()))
-            if key not in cache:
-                cache[key] = func(*args, **kwargs)
-            return cache[key]
+            key = _make_cache_key(args, kwargs)
+            try:
+                return cache[key]
+            except KeyError:
+                result = cache[key] = func(*args, **kwargs)
+                return result
 
         wrapper.cache = cache
         wrapper.clear_cache = lambda: cache.clear()
         return wrapper
 
     @staticmethod
-    def timed_cache(expiry_seconds: int = 300):
-        """Caching decorator with expiration time."""
+    def timed_cache(expiry_seconds: int = 300, maxsize: Optional[int] = 1024):
+        """Caching decorator with expiration time and LRU bound."""
         def decorator(func: Callable) -> Callable:
-            cache = {}
+            cache: OrderedDict = OrderedDict()
+            # (timestamp, key) per insert, oldest first, for reaping expired entries
+            reaper: deque = deque()
 
             @wraps(func)
             def wrapper(*args, **kwargs):
-                key = str(args) + str(sorted(kwargs.items()))
+                key = _make_cache_key(args, kwargs)
                 current_time = time.time()
 
-                if key in cache:
-                    value, timestamp = cache[key]
-                    if current_time - timestamp < expiry_seconds:
-                        return value
+                cutoff = current_time - expiry_seconds
+                while reaper and reaper[0][0] <= cutoff:
+                    timestamp, stale_key = reaper.popleft()
+                    entry = cache.get(stale_key)
+                    # Skip records superseded by a newer insert of the same key
+                    if entry is not None and entry[1] == timestamp:
+                        del cache[stale_key]
+
+                entry = cache.get(key)
+                if entry is not None:
+                    cache.move_to_end(key)
+                    return entry[0]
 
                 result = func(*args, **kwargs)
                 cache[key] = (result, current_time)
+                cache.move_to_end(key)
+                reaper.append((current_time, key))
+
+                if maxsize is not None and len(cache) > maxsize:
+                    cache.popitem(last=False)
+                # Evicted keys leave records behind; rebuild once they dominate
+                if len(reaper) > 2 * len(cache) + 64:
+                    live = sorted(((entry[1], k) for k, entry in cache.items()), key=itemgetter(0))
+                    reaper.clear()
+                    reaper.extend(live)
                 return result
 
+            def clear_cache():
+                cache.clear()
+                reaper.clear()
+
             wrapper.cache = cache
-            wrapper.clear_cache = lambda: cache.clear()
+            wrapper.clear_cache = clear_cache
             return wrapper
 
         return decorator
 
 
+@lru_cache(maxsize=4096)
+def _parse_date_cached(date_str: str) -> Optional[datetime]:
+    """Shape-dispatched date parsing behind DateTimeUtils.parse_date_string."""
+    # Pick the formats that could match from the string's shape, so a
+    # miss costs at most two failed strptime calls instead of nine
+    if '/' in date_str:
+        formats = _SLASH_DATE_FORMATS
+    elif 'T' in date_str or 't' in date_str:
+        if date_str[-1] in 'Zz':
+            formats = _ISO_UTC_DATETIME_FORMATS
+        else:
+            if _ISO_DATETIME_RE.fullmatch(date_str):
+                try:
+                    return datetime.fromisoformat(date_str)
+                except ValueError:
+                    pass
+            formats = _ISO_DATETIME_FORMATS
+    elif ':' in date_str:
+        formats = _SPACED_DATETIME_FORMATS
+    elif len(date_str.partition('-')[0]) == 4:
+        if _ISO_DATE_RE.fullmatch(date_str):
+            try:
+                return datetime.fromisoformat(date_str)
+            except ValueError:
+                pass
+        formats = _ISO_DATE_FORMATS
+    else:
+        formats = _DASHED_DATE_FORMATS
+
+    for fmt in formats:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+
+    return None
+
+
 class DateTimeUtils:
     """Date and time manipulation utilities."""
 
     @staticmethod
     def parse_date_string(date_str: str) -> Optional[datetime]:
         """Parse date string in various formats."""
-        formats = [
-            '%Y-%m-%d',
-            '%Y-%m-%d %H:%M:%S',
-            '%Y-%m-%dT%H:%M:%S',
-            '%Y-%m-%dT%H:%M:%SZ',
-            '%Y-%m-%dT%H:%M:%S.%fZ',
-            '%d/%m/%Y',
-            '%m/%d/%Y',
-            '%d-%m-%Y',
-            '%m-%d-%Y'
-        ]
-
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str, fmt)
-            except ValueError:
-                continue
-
-        return None
+        # Results are immutable, so repeated strings are served from a cache
+        return _parse_date_cached(date_str)
 
     @staticmethod
     def format_duration(seconds: Union[int, float]) -> str:
@@ -328,32 +507,21 @@ class DateTimeUtils:
     @staticmethod
     def get_business_days(start_date: datetime, end_date: datetime) -> int:
         """Count business days between two dates."""
-        business_days = 0
-        current_date = start_date.date()
-        end_date = end_date.date()
+        start = start_date.date()
+        total_days = (end_date.date() - start).days + 1
+        if total_days <= 0:
+            return 0
 
-        while current_date <= end_date:
-            if current_date.weekday() < 5:  # Monday = 0, Friday = 4
-                business_days += 1
-            current_date += timedelta(days=1)
-
-        return business_days
+        # Every full week has five business days; the leftover days are
+        # looked up by the weekday they start on
+        full_weeks, extra_days = divmod(total_days, 7)
+        return full_weeks * 5 + _EXTRA_BUSINESS_DAYS[start.weekday()][extra_days]
 
     @staticmethod
     def get_timezone_offset(tz_name: str = 'UTC') -> int:
         """Get timezone offset in hours from UTC."""
         # Simplified implementation - in real app would use pytz
-        tz_offsets = {
-            'UTC': 0,
-            'EST': -5,
-            'CST': -6,
-            'MST': -7,
-            'PST': -8,
-            'GMT': 0,
-            'CET': 1,
-            'JST': 9
-        }
-        return tz_offsets.get(tz_name.upper(), 0)
+        return TIMEZONE_OFFSETS.get(tz_name.upper(), 0)
 
     @staticmethod
     def is_weekend(date: datetime) -> bool:
@@ -374,11 +542,11 @@ class FileUtils:
     @staticmethod
     def get_file_size_str(size_bytes: int) -> str:
         """Convert file size in bytes to human-readable string."""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size_bytes < 1024:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024
-        return f"{size_bytes:.1f} PB"
+        if size_bytes < 1024:
+            return f"{size_bytes:.1f} B"
+        # Each unit is 2**10 of the previous one, so the bit length picks it
+        unit_index = min((int(size_bytes).bit_length() - 1) // 10, len(_FILE_SIZE_UNITS) - 1)
+        return f"{size_bytes / (1 << (10 * unit_index)):.1f} {_FILE_SIZE_UNITS[unit_index]}"
 
     @staticmethod
     def get_file_extension(filename: str) -> str:
@@ -388,7 +556,7 @@ class FileUtils:
     @staticmethod
     def safe_filename(filename: str) -> str:
         """Convert filename to safe version by removing invalid characters."""
-        filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
+        filename = _SAFE_FILENAME_RE.sub('_', filename)
         filename = filename.strip('. ')
         if len(filename) > 255:
             name, ext = os.path.splitext(filename)
@@ -425,12 +593,13 @@ class CryptoUtils:
 
     @staticmethod
     def hash_password(password: str, salt: Optional[str] = None) -> Tuple[str, str]:
-        """Hash password with salt using SHA-256."""
+        """Hash password with salt using PBKDF2-HMAC-SHA256."""
         if salt is None:
             salt = secrets.token_hex(32)
 
-        password_salt = (password + salt).encode('utf-8')
-        password_hash = hashlib.sha256(password_salt).hexdigest()
+        password_hash = hashlib.pbkdf2_hmac(
+            'sha256', password.encode('utf-8'), salt.encode('utf-8'), _PASSWORD_HASH_ITERATIONS
+        ).hex()
 
         return password_hash, salt
 
@@ -456,37 +625,31 @@ class CryptoUtils:
     @staticmethod
     def hash_file(filepath: Union[str, Path], algorithm: str = 'sha256') -> str:
         """Calculate hash of file contents."""
-        hash_algo = hashlib.new(algorithm)
-
         with open(filepath, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_algo.update(chunk)
+            # file_digest (3.11+) streams through a reusable buffer with the GIL released
+            if hasattr(hashlib, 'file_digest'):
+                return hashlib.file_digest(f, algorithm).hexdigest()
+
+            hash_algo = hashlib.new(algorithm)
+            buffer = bytearray(_HASH_CHUNK_SIZE)
+            view = memoryview(buffer)
+            while True:
+                size = f.readinto(buffer)
+                if not size:
+                    break
+                hash_algo.update(view[:size])
 
         return hash_algo.hexdigest()
 
     @staticmethod
     def simple_encrypt(text: str, key: str) -> str:
         """Simple XOR encryption (for demonstration only, not secure)."""
-        key_bytes = key.encode('utf-8')
-        text_bytes = text.encode('utf-8')
-
-        encrypted = bytearray()
-        for i, byte in enumerate(text_bytes):
-            encrypted.append(byte ^ key_bytes[i % len(key_bytes)])
-
-        return encrypted.hex()
+        return _xor_with_key(text.encode('utf-8'), key.encode('utf-8')).hex()
 
     @staticmethod
     def simple_decrypt(encrypted_hex: str, key: str) -> str:
         """Simple XOR decryption."""
-        key_bytes = key.encode('utf-8')
-        encrypted_bytes = bytes.fromhex(encrypted_hex)
-
-        decrypted = bytearray()
-        for i, byte in enumerate(encrypted_bytes):
-            decrypted.append(byte ^ key_bytes[i % len(key_bytes)])
-
-        return decrypted.decode('utf-8')
+        return _xor_with_key(bytes.fromhex(encrypted_hex), key.encode('utf-8')).decode('utf-8')
 
 
 class MathUtils:
@@ -526,21 +689,14 @@ class MathUtils:
         """Calculate average of list of numbers."""
         if not values:
             return 0.0
-        return sum(values) / len(values)
+        return statistics.fmean(values)
 
     @staticmethod
     def median(values: List[Union[int, float]]) -> float:
         """Calculate median of list of numbers."""
         if not values:
             return 0.0
-
-        sorted_values = sorted(values)
-        n = len(sorted_values)
-
-        if n % 2 == 0:
-            return (sorted_values[n // 2 - 1] + sorted_values[n // 2]) / 2
-        else:
-            return sorted_values[n // 2]
+        return statistics.median(values)
 
     @staticmethod
     def compound_interest(principal: float, rate: float, time: float, compound_frequency: int = 1) -> float:
@@ -560,18 +716,17 @@ class CollectionUtils:
     @staticmethod
     def flatten_list(nested_list: List[List[T]]) -> List[T]:
         """Flatten nested list structure."""
-        return [item for sublist in nested_list for item in sublist]
+        return list(chain.from_iterable(nested_list))
+
+    @staticmethod
+    def iflatten(nested: Iterable[Iterable[T]]) -> Iterator[T]:
+        """Lazily flatten one level of nesting."""
+        return chain.from_iterable(nested)
 
     @staticmethod
     def remove_duplicates(lst: List[T]) -> List[T]:
-        """Remove duplicates while preserving order."""
-        seen = set()
-        result = []
-        for item in lst:
-            if item not in seen:
-                seen.add(item)
-                result.append(item)
-        return result
+        """Remove duplicates while preserving order (items must be hashable)."""
+        return list(dict.fromkeys(lst))
 
     @staticmethod
     def group_by(lst: List[T], key_func: Callable[[T], K]) -> Dict[K, List[T]]:
@@ -584,9 +739,16 @@ class CollectionUtils:
 
     @staticmethod
     def find_duplicates(lst: List[T]) -> List[T]:
-        """Find duplicate items in list."""
-        counts = Counter(lst)
-        return [item for item, count in counts.items() if count > 1]
+        """Find duplicate items in list, in the order they first repeat."""
+        seen = set()
+        seen_add = seen.add
+        duplicates = {}
+        for item in lst:
+            if item in seen:
+                duplicates[item] = None
+            else:
+                seen_add(item)
+        return list(duplicates)
 
     @staticmethod
     def deep_merge_dicts(dict1: Dict, dict2: Dict) -> Dict:
@@ -630,12 +792,12 @@ class URLUtils:
     def parse_url(url: str) -> Dict[str, Any]:
         """Parse URL into components."""
         parsed = urlparse(url)
-        query_params = parse_qs(parsed.query)
 
-        # Convert single-item lists to strings
-        for key, value in query_params.items():
-            if len(value) == 1:
-                query_params[key] = value[0]
+        # Unwrap single-item lists to strings
+        query_params = {
+            key: value[0] if len(value) == 1 else value
+            for key, value in parse_qs(parsed.query).items()
+        }
 
         return {
             'scheme': parsed.scheme,
@@ -698,11 +860,10 @@ def validate_email(email: str) -> bool:
 @cache_utils.timed_cache(300)  # 5-minute cache
 def expensive_computation(n: int) -> int:
     """Example of cached expensive computation."""
-    # Simulate expensive computation
-    result = 0
-    for i in range(n):
-        result += i ** 2
-    return result
+    # Sum of i**2 for i in range(n), in closed form
+    if n <= 0:
+        return 0
+    return n * (n - 1) * (2 * n - 1) // 6
 
 
 def format_currency(amount: Union[int, float, Decimal], currency: str = 'USD') -> str: